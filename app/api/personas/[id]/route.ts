@@ -2,6 +2,7 @@ import { NextRequest, NextResponse } from 'next/server'
 import { getServerSession } from 'next-auth/next'
 import { authOptions } from '@/lib/auth'
 import { prisma } from '@/lib/prisma'
+import { INTERNAL_PERSONA_SELECT, personaEtag } from '@/lib/internal-persona'
 
 export async function GET(
   request: NextRequest,
@@ -20,27 +21,23 @@ export async function GET(
       // For internal service calls, allow access to any persona
       const persona = await prisma.persona.findUnique({
         where: { id },
-        select: {
-          id: true,
-          name: true,
-          age: true,
-          occupation: true,
-          location: true,
-          personalityTraits: true,
-          interests: true,
-          gadgets: true,
-          tags: true,
-          introduction: true,
-          isPublic: true,
-          createdBy: true,
-        },
+        select: INTERNAL_PERSONA_SELECT,
       })
 
       if (!persona) {
         return NextResponse.json({ error: 'Persona not found' }, { status: 404 })
       }
 
-      return NextResponse.json(persona)
+      // ETag lets the Python agent service revalidate its persona cache cheaply
+      const body = JSON.stringify(persona)
+      const etag = personaEtag(body)
+      if (request.headers.get('if-none-match') === etag) {
+        return new NextResponse(null, { status: 304, headers: { ETag: etag } })
+      }
+
+      return new NextResponse(body, {
+        headers: { 'Content-Type': 'application/json', ETag: etag },
+      })
     }
     
     // Regular user authentication
@@ -3,6 +3,7 @@ import { getServerSession } from 'next-auth/next'
 import { authOptions } from '@/lib/auth'
 import { prisma } from '@/lib/prisma'
 import { researchRAG } from '@/lib/research-rag'
+import { INTERNAL_PERSONA_SELECT, personaEtag } from '@/lib/internal-persona'
 
 export async function GET(request: NextRequest) {
   try {
@@ -13,22 +14,29 @@ export async function GET(request: NextRequest) {
     let userId: string | undefined;
     
     if (isInternalService) {
+      // Bulk fetch for the agent service: ?ids=a,b,c returns just those personas
+      const idsParam = request.nextUrl.searchParams.get('ids');
+      if (idsParam !== null) {
+        const ids = [...new Set(idsParam.split(',').map(id => id.trim()).filter(Boolean))];
+        const personas = await prisma.persona.findMany({
+          where: { id: { in: ids } },
+          select: INTERNAL_PERSONA_SELECT,
+        });
+        const etags: Record<string, string> = {};
+        for (const persona of personas) {
+          etags[persona.id] = personaEtag(JSON.stringify(persona));
+        }
+        const found = new Set(personas.map(persona => persona.id));
+        return NextResponse.json({
+          personas,
+          etags,
+          missing: ids.filter(id => !found.has(id)),
+        });
+      }
+
       // For internal service calls, return all personas
       const personas = await prisma.persona.findMany({
-        select: {
-          id: true,
-          name: true,
-          age: true,
-          occupation: true,
-          location: true,
-          personalityTraits: true,
-          interests: true,
-          gadgets: true,
-          tags: true,
-          introduction: true,
-          isPublic: true,
-          createdBy: true,
-        }
+        select: INTERNAL_PERSONA_SELECT,
       });
       return NextResponse.json(personas);
     }
@@ -126,6 +126,7 @@ export default function MultiAgentSystemInterface({ workflow, systemInfo, person
   const [googleADKHealth, setGoogleADKHealth] = useState<boolean>(false);
   const [langGraphHealth, setLangGraphHealth] = useState<boolean>(false);
   const [streamingEvents, setStreamingEvents] = useState<any[]>([]);
+  const [streamingText, setStreamingText] = useState<Record<string, string>>({});
   const [isStreaming, setIsStreaming] = useState(false);
   const [streamingSession, setStreamingSession] = useState<any>(null);
 
@@ -262,6 +263,7 @@ export default function MultiAgentSystemInterface({ workflow, systemInfo, person
     try {
       setIsStreaming(true);
       setStreamingEvents([]);
+      setStreamingText({});
       
       const sessionId = `google_adk_stream_${Date.now()}`;
       setStreamingSession({
@@ -312,6 +314,14 @@ export default function MultiAgentSystemInterface({ workflow, systemInfo, person
             if (line.trim().startsWith('data: ')) {
               try {
                 const eventData = JSON.parse(line.slice(6));
+
+                // Token events grow the live text instead of the event log
+                if (eventData.type === 'persona_token' || eventData.type === 'synthesis_token') {
+                  const key = eventData.persona?.id ?? 'synthesis';
+                  setStreamingText(prev => ({ ...prev, [key]: (prev[key] || '') + eventData.token }));
+                  continue;
+                }
+
                 setStreamingEvents(prev => [...prev, eventData]);
 
                 // Handle completion
@@ -507,6 +517,16 @@ export default function MultiAgentSystemInterface({ workflow, systemInfo, person
                   </div>
                 ))}
                 
+                {streamingText.synthesis && (
+                  <div className="p-3 rounded-lg border-l-4 border-indigo-500 bg-indigo-50">
+                    <div className="font-medium flex items-center gap-2 mb-2">
+                      <Zap className="w-4 h-4" />
+                      AI Synthesizer
+                    </div>
+                    <div className="text-sm whitespace-pre-wrap">{streamingText.synthesis}</div>
+                  </div>
+                )}
+                
                 {streamingEvents.length === 0 && (
                   <div className="text-center text-muted-foreground py-8">
                     <Loader2 className="h-8 w-8 animate-spin mx-auto mb-2" />
@@ -553,6 +573,9 @@ export default function MultiAgentSystemInterface({ workflow, systemInfo, person
                     {lastEvent?.message && (
                       <div className="text-xs mt-1 text-gray-600">{lastEvent.message}</div>
                     )}
+                    {status === 'responding' && streamingText[persona.id] && (
+                      <div className="text-xs mt-2 text-gray-800 whitespace-pre-wrap">{streamingText[persona.id]}</div>
+                    )}
                   </div>
                 );
               })}
@@ -0,0 +1,23 @@
+import { createHash } from 'crypto'
+
+// Fields returned to the internal Python agent service
+export const INTERNAL_PERSONA_SELECT = {
+  id: true,
+  name: true,
+  age: true,
+  occupation: true,
+  location: true,
+  personalityTraits: true,
+  interests: true,
+  gadgets: true,
+  tags: true,
+  introduction: true,
+  isPublic: true,
+  createdBy: true,
+  updatedAt: true,
+} as const
+
+// Strong ETag over the serialized persona, used by the agent service cache
+export function personaEtag(body: string): string {
+  return `"${createHash('sha1').update(body).digest('hex')}"`
+}
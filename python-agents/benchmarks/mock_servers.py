@@ -0,0 +1,142 @@
+"""Local stand-ins for the Grok API and the TypeScript persona API
+
+Run with ``uvicorn benchmarks.mock_servers:app`` from python-agents/. One
+app serves both upstreams: point GROK_API_BASE_URL at ``<url>/v1`` and
+TYPESCRIPT_API_URL at ``<url>``. Behaviour is configured through env vars
+so the harness can start it as a subprocess:
+
+- MOCK_GROK_LATENCY: latency distribution of a completion, e.g.
+  ``fixed:0.5``, ``uniform:0.2:1.0``, ``normal:0.8:0.2`` or
+  ``lognormal:0.8:0.4`` (median, sigma)
+- MOCK_GROK_ERROR_RATE / MOCK_GROK_ERROR_STATUS: fraction of completions
+  answered with an error status (429 also sends Retry-After)
+- MOCK_STREAM_CHUNKS / MOCK_STREAM_TTFT_FRACTION: streaming shape; the
+  first chunk arrives after that fraction of the sampled latency
+- MOCK_PERSONA_LATENCY: latency distribution of persona fetches
+- MOCK_SEED: seed for reproducible runs
+"""
+
+import os
+import asyncio
+import hashlib
+import json
+import math
+import random
+from typing import Callable
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+MOCK_GROK_LATENCY = os.getenv("MOCK_GROK_LATENCY", "lognormal:0.8:0.4")
+MOCK_GROK_ERROR_RATE = float(os.getenv("MOCK_GROK_ERROR_RATE", "0"))
+MOCK_GROK_ERROR_STATUS = int(os.getenv("MOCK_GROK_ERROR_STATUS", "503"))
+MOCK_STREAM_CHUNKS = int(os.getenv("MOCK_STREAM_CHUNKS", "20"))
+MOCK_STREAM_TTFT_FRACTION = float(os.getenv("MOCK_STREAM_TTFT_FRACTION", "0.3"))
+MOCK_PERSONA_LATENCY = os.getenv("MOCK_PERSONA_LATENCY", "fixed:0.02")
+MOCK_SEED = int(os.getenv("MOCK_SEED", "1"))
+
+COMPLETION_WORDS = 120
+
+
+def parse_latency(spec: str, rng: random.Random) -> Callable[[], float]:
+    """Turn ``kind:params`` into a sampler returning seconds"""
+    kind, _, params = spec.partition(":")
+    values = [float(v) for v in params.split(":") if v]
+    if kind == "fixed":
+        return lambda: values[0]
+    if kind == "uniform":
+        return lambda: rng.uniform(values[0], values[1])
+    if kind == "normal":
+        return lambda: max(0.0, rng.gauss(values[0], values[1]))
+    if kind == "lognormal":
+        return lambda: rng.lognormvariate(math.log(values[0]), values[1])
+    raise ValueError(f"Unknown latency distribution: {spec}")
+
+
+rng = random.Random(MOCK_SEED)
+grok_latency = parse_latency(MOCK_GROK_LATENCY, rng)
+persona_latency = parse_latency(MOCK_PERSONA_LATENCY, rng)
+
+app = FastAPI(title="PersonaDoc benchmark stand-ins")
+
+
+def fake_persona(persona_id: str) -> dict:
+    index = int(hashlib.sha1(persona_id.encode()).hexdigest(), 16) % 1000
+    return {
+        "id": persona_id,
+        "name": f"Persona {persona_id}",
+        "age": 25 + index % 40,
+        "occupation": ["engineer", "teacher", "designer", "nurse"][index % 4],
+        "location": ["Austin", "Berlin", "Lagos", "Osaka"][index % 4],
+        "personalityTraits": ["curious", "pragmatic", "direct"],
+        "interests": ["cycling", "history", "cooking"],
+        "introduction": "A synthetic persona used for load testing. " * 4,
+        "updatedAt": "2024-01-01T00:00:00.000Z",
+    }
+
+
+def completion_text(prompt: str) -> str:
+    seed = int(hashlib.sha1(prompt.encode()).hexdigest()[:8], 16)
+    words = ["insight", "tradeoff", "users", "cost", "risk", "value", "team", "data"]
+    return " ".join(words[(seed + i) % len(words)] for i in range(COMPLETION_WORDS))
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    body = await request.json()
+    latency = grok_latency()
+
+    if rng.random() < MOCK_GROK_ERROR_RATE:
+        await asyncio.sleep(latency * 0.1)
+        headers = {"Retry-After": "1"} if MOCK_GROK_ERROR_STATUS == 429 else {}
+        return JSONResponse(status_code=MOCK_GROK_ERROR_STATUS, content={"error": "mock failure"}, headers=headers)
+
+    prompt = "".join(message.get("content") or "" for message in body.get("messages", []))
+    text = completion_text(prompt)
+    usage = {
+        "prompt_tokens": len(prompt) // 4,
+        "completion_tokens": COMPLETION_WORDS,
+        "total_tokens": len(prompt) // 4 + COMPLETION_WORDS,
+    }
+
+    if not body.get("stream"):
+        await asyncio.sleep(latency)
+        return {
+            "id": "mock",
+            "object": "chat.completion",
+            "model": body.get("model", "grok-3"),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+            "usage": usage,
+        }
+
+    async def stream():
+        words = text.split(" ")
+        per_chunk = max(1, len(words) // MOCK_STREAM_CHUNKS)
+        chunks = [" ".join(words[i:i + per_chunk]) + " " for i in range(0, len(words), per_chunk)]
+        await asyncio.sleep(latency * MOCK_STREAM_TTFT_FRACTION)
+        gap = latency * (1 - MOCK_STREAM_TTFT_FRACTION) / len(chunks)
+        for chunk in chunks:
+            payload = {"choices": [{"index": 0, "delta": {"content": chunk}}]}
+            yield f"data: {json.dumps(payload)}\n\n"
+            await asyncio.sleep(gap)
+        yield "data: [DONE]\n\n"
+
+    return StreamingResponse(stream(), media_type="text/event-stream")
+
+
+@app.get("/api/personas/{persona_id}")
+async def get_persona(persona_id: str):
+    await asyncio.sleep(persona_latency())
+    return fake_persona(persona_id)
+
+
+@app.get("/api/personas")
+async def get_personas(ids: str = ""):
+    await asyncio.sleep(persona_latency())
+    personas = [fake_persona(persona_id) for persona_id in ids.split(",") if persona_id]
+    return {"personas": personas, "etags": {}, "missing": []}
+
+
+@app.post("/api/multi-agent-sessions/{session_id}/update")
+async def session_update(session_id: str):
+    return {"ok": True}
@@ -0,0 +1,429 @@
+"""Load benchmark for the agent service against local Grok/TypeScript stand-ins
+
+Starts ``benchmarks.mock_servers:app`` and ``main:app`` as uvicorn
+subprocesses, drives the analyze endpoints at each concurrency level and
+persona count, and writes a JSON report so runs can be compared across
+commits:
+
+    cd python-agents
+    python -m benchmarks.run_benchmark --concurrency 1,8,32 --personas 3,10
+    python -m benchmarks.run_benchmark --compare benchmarks/results/<baseline>.json
+
+Every request uses a fresh session ID and the completion cache is off, so
+each analysis pays for its upstream calls. Latency distributions, error
+rates and streaming shape of the mock Grok are set with the --grok-* flags.
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+import httpx
+
+AGENTS_DIR = Path(__file__).resolve().parent.parent
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+ENDPOINTS = ("google-adk", "multi-agent", "stream", "websocket")
+LAG_PROBE_INTERVAL = 0.05
+STARTUP_TIMEOUT = 30.0
+
+
+def percentile(values: List[float], q: float) -> Optional[float]:
+    """Nearest-rank percentile, ``q`` in [0, 100]"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, math.ceil(q / 100 * len(ordered)) - 1))
+    return round(ordered[index], 1)
+
+
+def summarize(values_ms: List[float]) -> Dict[str, Optional[float]]:
+    return {
+        "p50": percentile(values_ms, 50),
+        "p95": percentile(values_ms, 95),
+        "p99": percentile(values_ms, 99),
+        "max": round(max(values_ms), 1) if values_ms else None,
+        "mean": round(statistics.fmean(values_ms), 1) if values_ms else None,
+    }
+
+
+def rss_mb(pid: int) -> Optional[float]:
+    """Resident set size of a process from /proc (Linux only)"""
+    try:
+        with open(f"/proc/{pid}/status") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        return None
+    return None
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def git_revision() -> Dict[str, Any]:
+    def git(*args: str) -> str:
+        return subprocess.run(
+            ["git", *args], cwd=AGENTS_DIR, capture_output=True, text=True, check=False
+        ).stdout.strip()
+
+    return {"commit": git("rev-parse", "HEAD") or None, "dirty": bool(git("status", "--porcelain", "--", "."))}
+
+
+@contextmanager
+def uvicorn_server(target: str, port: int, env: Dict[str, str]) -> Iterator[subprocess.Popen]:
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", target, "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=AGENTS_DIR,
+        env={**os.environ, **env},
+    )
+    try:
+        yield process
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+async def wait_until_ready(url: str, process: subprocess.Popen):
+    deadline = time.monotonic() + STARTUP_TIMEOUT
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                raise RuntimeError(f"Server for {url} exited with code {process.returncode}")
+            try:
+                if (await client.get(url)).status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError(f"Server for {url} did not become ready within {STARTUP_TIMEOUT}s")
+
+
+class LagProbe:
+    """Polls /health during a scenario to estimate event-loop lag and RSS
+
+    /health does no I/O, so its latency above the idle baseline is time
+    the request spent waiting for the service's event loop.
+    """
+
+    def __init__(self, client: httpx.AsyncClient, base_url: str, pid: int, baseline_ms: float):
+        self.client = client
+        self.base_url = base_url
+        self.pid = pid
+        self.baseline_ms = baseline_ms
+        self.lag_ms: List[float] = []
+        self.rss: List[float] = []
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self):
+        while True:
+            started = time.perf_counter()
+            try:
+                await self.client.get(f"{self.base_url}/health")
+                self.lag_ms.append(max(0.0, (time.perf_counter() - started) * 1000 - self.baseline_ms))
+            except httpx.HTTPError:
+                pass
+            if (rss := rss_mb(self.pid)) is not None:
+                self.rss.append(rss)
+            await asyncio.sleep(LAG_PROBE_INTERVAL)
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+
+
+async def idle_health_latency(client: httpx.AsyncClient, base_url: str, samples: int = 20) -> float:
+    timings = []
+    for _ in range(samples):
+        started = time.perf_counter()
+        await client.get(f"{base_url}/health")
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+async def watchdog_stalls(client: httpx.AsyncClient, base_url: str) -> Optional[int]:
+    """Stall count from the service's loop watchdog (None on builds without it)"""
+    response = await client.get(f"{base_url}/debug/event-loop")
+    return response.json()["stalls"] if response.status_code == 200 else None
+
+
+def analyze_body(args: argparse.Namespace, personas: int, framework: str) -> Dict[str, Any]:
+    return {
+        "session_id": f"bench-{uuid.uuid4().hex[:12]}",
+        "user_query": args.query,
+        "persona_ids": [f"bench-persona-{i}" for i in range(personas)],
+        "framework": framework,
+    }
+
+
+async def run_json(client: httpx.AsyncClient, base_url: str, path: str, body: Dict[str, Any]) -> Dict[str, Any]:
+    response = await client.post(f"{base_url}{path}", json=body)
+    response.raise_for_status()
+    return {}
+
+
+async def run_stream(client: httpx.AsyncClient, base_url: str, body: Dict[str, Any]) -> Dict[str, Any]:
+    started = time.perf_counter()
+    first_token_ms = None
+    async with client.stream("POST", f"{base_url}/google-adk/analyze-stream", json=body) as response:
+        response.raise_for_status()
+        async for line in response.aiter_lines():
+            if not line.startswith("data: "):
+                continue
+            event = json.loads(line[len("data: "):])
+            if event.get("type") == "error":
+                raise RuntimeError(event.get("message"))
+            if first_token_ms is None and event.get("type") == "synthesis_token":
+                first_token_ms = (time.perf_counter() - started) * 1000
+    return {"first_token_ms": first_token_ms}
+
+
+async def run_websocket(client: httpx.AsyncClient, base_url: str, body: Dict[str, Any]) -> Dict[str, Any]:
+    """Subscribe to the session stream, then run the analysis and time the pushed events"""
+    import websockets
+
+    ws_url = base_url.replace("http://", "ws://", 1) + f"/multi-agent/session/{body['session_id']}/stream"
+    started = time.perf_counter()
+    event_times: List[float] = []
+
+    async with websockets.connect(ws_url) as websocket:
+        async def receive():
+            async for _ in websocket:
+                event_times.append((time.perf_counter() - started) * 1000)
+
+        receiver = asyncio.create_task(receive())
+        try:
+            await run_json(client, base_url, "/multi-agent/analyze", body)
+            await asyncio.sleep(0.05)  # Let events published just before the response arrive
+        finally:
+            receiver.cancel()
+
+    return {"first_event_ms": event_times[0] if event_times else None, "events": len(event_times)}
+
+
+async def run_scenario(
+    args: argparse.Namespace,
+    client: httpx.AsyncClient,
+    base_url: str,
+    pid: int,
+    baseline_ms: float,
+    endpoint: str,
+    concurrency: int,
+    personas: int
+) -> Dict[str, Any]:
+    total = max(args.requests, concurrency)
+    remaining = iter(range(total))
+    latencies: List[float] = []
+    extras: Dict[str, List[float]] = {}
+    errors: Dict[str, int] = {}
+
+    async def one_request():
+        if endpoint == "google-adk":
+            return await run_json(client, base_url, "/google-adk/analyze", analyze_body(args, personas, "google-adk"))
+        if endpoint == "multi-agent":
+            return await run_json(client, base_url, "/multi-agent/analyze", analyze_body(args, personas, args.framework))
+        if endpoint == "stream":
+            return await run_stream(client, base_url, analyze_body(args, personas, "google-adk"))
+        return await run_websocket(client, base_url, analyze_body(args, personas, args.framework))
+
+    async def worker():
+        for _ in remaining:
+            started = time.perf_counter()
+            try:
+                extra = await one_request()
+            except Exception as e:
+                key = f"{e.response.status_code}" if isinstance(e, httpx.HTTPStatusError) else type(e).__name__
+                errors[key] = errors.get(key, 0) + 1
+                continue
+            latencies.append((time.perf_counter() - started) * 1000)
+            for name, value in extra.items():
+                if value is not None:
+                    extras.setdefault(name, []).append(value)
+
+    stalls_before = await watchdog_stalls(client, base_url)
+    probe = LagProbe(client, base_url, pid, baseline_ms)
+    rss_start = rss_mb(pid)
+    probe.start()
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    duration = time.perf_counter() - started
+    await probe.stop()
+
+    result = {
+        "endpoint": endpoint,
+        "framework": "google-adk" if endpoint in ("google-adk", "stream") else args.framework,
+        "concurrency": concurrency,
+        "personas": personas,
+        "requests": total,
+        "succeeded": len(latencies),
+        "errors": errors,
+        "duration_s": round(duration, 2),
+        "throughput_rps": round(len(latencies) / duration, 2) if duration else None,
+        "latency_ms": summarize(latencies),
+        "event_loop_lag_ms": summarize(probe.lag_ms),
+        "rss_mb": {"start": rss_start, "peak": max(probe.rss, default=None), "end": rss_mb(pid)},
+        "event_loop_stalls": (
+            await watchdog_stalls(client, base_url) - stalls_before if stalls_before is not None else None
+        ),
+    }
+    for name, values in extras.items():
+        result[name] = summarize(values) if name.endswith("_ms") else sum(values)
+    return result
+
+
+def scenario_key(result: Dict[str, Any]) -> tuple:
+    return (result["endpoint"], result["framework"], result["concurrency"], result["personas"])
+
+
+def print_row(result: Dict[str, Any], baseline: Optional[Dict[str, Any]] = None):
+    latency = result["latency_ms"]
+    line = (
+        f"{result['endpoint']:<12} c={result['concurrency']:<4} p={result['personas']:<3} "
+        f"rps={result['throughput_rps']!s:<7} p50={latency['p50']!s:<8} p95={latency['p95']!s:<8} "
+        f"p99={latency['p99']!s:<8} lag_p99={result['event_loop_lag_ms']['p99']!s:<7} "
+        f"rss_peak={result['rss_mb']['peak']!s:<7} errors={sum(result['errors'].values())}"
+    )
+    if baseline is not None:
+        def delta(new, old):
+            return f"{(new - old) / old * 100:+.1f}%" if new is not None and old else "n/a"
+
+        line += (
+            f"  | vs baseline rps {delta(result['throughput_rps'], baseline['throughput_rps'])}"
+            f" p95 {delta(latency['p95'], baseline['latency_ms']['p95'])}"
+        )
+    print(line, flush=True)
+
+
+def parse_list(value: str) -> List[int]:
+    return [int(v) for v in value.split(",") if v]
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--endpoints", default=",".join(ENDPOINTS), help=f"Comma-separated subset of {ENDPOINTS}")
+    parser.add_argument("--framework", default="google-adk", help="Framework for multi-agent and websocket scenarios")
+    parser.add_argument("--concurrency", type=parse_list, default=[1, 4, 16], help="Comma-separated client concurrency levels")
+    parser.add_argument("--personas", type=parse_list, default=[3], help="Comma-separated persona counts")
+    parser.add_argument("--requests", type=int, default=20, help="Requests per scenario (at least the concurrency)")
+    parser.add_argument("--query", default="How would you feel about a subscription price increase?")
+    parser.add_argument("--grok-latency", default="lognormal:0.8:0.4", help="fixed:S | uniform:A:B | normal:MEAN:SD | lognormal:MEDIAN:SIGMA")
+    parser.add_argument("--grok-error-rate", type=float, default=0.0)
+    parser.add_argument("--grok-error-status", type=int, default=503)
+    parser.add_argument("--stream-chunks", type=int, default=20)
+    parser.add_argument("--persona-latency", default="fixed:0.02")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--env", action="append", default=[], metavar="KEY=VALUE", help="Extra env for the service under test")
+    parser.add_argument("--output", type=Path, help="Result file (default: benchmarks/results/<timestamp>-<commit>.json)")
+    parser.add_argument("--compare", type=Path, help="Earlier result file to print deltas against")
+    return parser.parse_args(argv)
+
+
+async def main(argv: Optional[List[str]] = None):
+    args = parse_args(argv)
+    endpoints = [e for e in args.endpoints.split(",") if e]
+    unknown = set(endpoints) - set(ENDPOINTS)
+    if unknown:
+        raise SystemExit(f"Unknown endpoints: {', '.join(sorted(unknown))}")
+    if "websocket" in endpoints:
+        try:
+            import websockets  # noqa: F401
+        except ImportError:
+            print("websockets is not installed; skipping the websocket scenario", file=sys.stderr)
+            endpoints.remove("websocket")
+
+    mock_port, service_port = free_port(), free_port()
+    mock_url = f"http://127.0.0.1:{mock_port}"
+    service_url = f"http://127.0.0.1:{service_port}"
+    mock_env = {
+        "MOCK_GROK_LATENCY": args.grok_latency,
+        "MOCK_GROK_ERROR_RATE": str(args.grok_error_rate),
+        "MOCK_GROK_ERROR_STATUS": str(args.grok_error_status),
+        "MOCK_STREAM_CHUNKS": str(args.stream_chunks),
+        "MOCK_PERSONA_LATENCY": args.persona_latency,
+        "MOCK_SEED": str(args.seed),
+    }
+    service_env = {
+        "GROK_API_BASE_URL": f"{mock_url}/v1",
+        "TYPESCRIPT_API_URL": mock_url,
+        "GROK_API_KEY": "benchmark",
+        "OPENAI_API_KEY": "benchmark",
+        "API_TOKEN": "benchmark",
+        "COMPLETION_CACHE_BACKEND": "none",
+        "UPSTREAM_REQUESTS_PER_MINUTE": "0",
+        "UPSTREAM_TOKENS_PER_MINUTE": "0",
+        "LOG_LEVEL": "WARNING",
+        **dict(item.split("=", 1) for item in args.env),
+    }
+
+    baseline = {}
+    if args.compare:
+        baseline = {scenario_key(r): r for r in json.loads(args.compare.read_text())["results"]}
+
+    results = []
+    with uvicorn_server("benchmarks.mock_servers:app", mock_port, mock_env) as mock, \
+            uvicorn_server("main:app", service_port, service_env) as service:
+        await wait_until_ready(f"{mock_url}/api/personas/ready", mock)
+        await wait_until_ready(f"{service_url}/health", service)
+
+        limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+        async with httpx.AsyncClient(timeout=300, limits=limits) as client:
+            baseline_ms = await idle_health_latency(client, service_url)
+            for endpoint in endpoints:
+                for personas in args.personas:
+                    for concurrency in args.concurrency:
+                        result = await run_scenario(
+                            args, client, service_url, service.pid, baseline_ms, endpoint, concurrency, personas
+                        )
+                        results.append(result)
+                        print_row(result, baseline.get(scenario_key(result)))
+
+    revision = git_revision()
+    report = {
+        "git": revision,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {
+            **{k: (str(v) if isinstance(v, Path) else v) for k, v in vars(args).items()},
+            "mock_env": mock_env,
+            "service_env": service_env,
+            "idle_health_ms": round(baseline_ms, 2),
+        },
+        "results": results,
+    }
+    output = args.output
+    if output is None:
+        RESULTS_DIR.mkdir(exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        output = RESULTS_DIR / f"{stamp}-{(revision['commit'] or 'nogit')[:8]}.json"
+    output.write_text(json.dumps(report, indent=2))
+    print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
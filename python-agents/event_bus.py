@@ -0,0 +1,96 @@
+import os
+import asyncio
+from typing import Dict, Any, Optional, Set
+
+# Events buffered per WebSocket subscriber before it is considered too slow
+SUBSCRIBER_QUEUE_SIZE = int(os.getenv("SUBSCRIBER_QUEUE_SIZE", "256"))
+
+
+class Subscription:
+    """One subscriber's bounded queue of session events
+
+    Publishing never blocks: if the subscriber falls behind and its queue
+    fills up, it is marked as overflowed and detached from the bus. The
+    consumer then receives None and should reconnect to resync from the
+    session snapshot.
+    """
+
+    def __init__(self, bus: "SessionEventBus", session_id: str, maxsize: int):
+        self.bus = bus
+        self.session_id = session_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self.overflowed = False
+        self.closed = False
+
+    def deliver(self, event: Dict[str, Any]):
+        if self.closed:
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+            self.close()
+
+    async def get(self) -> Optional[Dict[str, Any]]:
+        """Next event, or None once the subscription has been closed"""
+        if self.closed and self.queue.empty():
+            return None
+        return await self.queue.get()
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        self.bus._unsubscribe(self)
+        # Wake the consumer; make room for the sentinel if the queue is full
+        while self.queue.full():
+            self.queue.get_nowait()
+        self.queue.put_nowait(None)
+
+
+class SessionEventBus:
+    """In-process pub/sub of incremental session events, keyed by session ID
+
+    Per worker process: a shared (sqlite) session store does not make live
+    events cross workers, so a subscriber on another worker only sees the
+    stored result.
+    """
+
+    def __init__(self, subscriber_queue_size: int = SUBSCRIBER_QUEUE_SIZE):
+        self.subscriber_queue_size = subscriber_queue_size
+        self._subscribers: Dict[str, Set[Subscription]] = {}
+        self.published = 0
+        self.overflows = 0
+
+    def subscribe(self, session_id: str) -> Subscription:
+        subscription = Subscription(self, session_id, self.subscriber_queue_size)
+        self._subscribers.setdefault(session_id, set()).add(subscription)
+        return subscription
+
+    def _unsubscribe(self, subscription: Subscription):
+        if subscription.overflowed:
+            self.overflows += 1
+        subscribers = self._subscribers.get(subscription.session_id)
+        if subscribers is None:
+            return
+        subscribers.discard(subscription)
+        if not subscribers:
+            del self._subscribers[subscription.session_id]
+
+    def publish(self, session_id: str, event: Dict[str, Any]):
+        """Fan an event out to the session's subscribers without blocking"""
+        self.published += 1
+        for subscription in list(self._subscribers.get(session_id, ())):
+            subscription.deliver(event)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "sessions": len(self._subscribers),
+            "subscribers": sum(len(subs) for subs in self._subscribers.values()),
+            "published": self.published,
+            "overflows": self.overflows,
+        }
+
+
+# Global instance shared by coordinators and WebSocket endpoints
+session_events = SessionEventBus()
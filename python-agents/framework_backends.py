@@ -0,0 +1,82 @@
+import importlib
+import importlib.util
+import logging
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# name -> (module, attribute holding the system instance, packages it needs)
+FRAMEWORK_BACKENDS = {
+    "google-adk": ("google_adk_system", "google_adk_system", ["httpx"]),
+    "langgraph": ("langgraph_system", "multi_agent_system", ["langgraph", "langchain_openai"]),
+}
+
+
+class FrameworkBackends:
+    """Imports each multi-agent framework on first use instead of at startup
+
+    The heavy SDKs behind a backend are only loaded when a request needs that
+    framework. Each import is timed, and the top-level packages it pulled in
+    are recorded so the cold-start cost of every backend is visible.
+    """
+
+    def __init__(self, backends: Dict[str, tuple] = FRAMEWORK_BACKENDS):
+        self.backends = backends
+        self._systems: Dict[str, Any] = {}
+        self._errors: Dict[str, str] = {}
+        self.import_report: Dict[str, Dict[str, Any]] = {}
+
+    def installed(self, name: str) -> bool:
+        """Whether a backend's dependencies are present, without importing them"""
+        if name not in self.backends or name in self._errors:
+            return False
+        _, _, packages = self.backends[name]
+        return all(importlib.util.find_spec(package) is not None for package in packages)
+
+    def available(self) -> List[str]:
+        return [name for name in self.backends if self.installed(name)]
+
+    def loaded(self) -> List[str]:
+        return list(self._systems)
+
+    def get(self, name: str) -> Optional[Any]:
+        """Return the backend's system instance, importing it on first use"""
+        if name in self._systems:
+            return self._systems[name]
+        if name not in self.backends or name in self._errors:
+            return None
+
+        module_name, attribute, _ = self.backends[name]
+        before = {module.split(".")[0] for module in sys.modules}
+        started = time.perf_counter()
+        try:
+            module = importlib.import_module(module_name)
+            system = getattr(module, attribute)
+        except ImportError as e:
+            self._errors[name] = str(e)
+            logger.warning("%s system not available: %s", name, e)
+            return None
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        new_packages = sorted({module.split(".")[0] for module in sys.modules} - before)
+        self.import_report[name] = {
+            "module": module_name,
+            "import_ms": round(elapsed_ms, 1),
+            "new_packages": new_packages,
+        }
+        self._systems[name] = system
+        return system
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "available": self.available(),
+            "loaded": self.loaded(),
+            "imports": self.import_report,
+            "errors": self._errors,
+        }
+
+
+# Global instance used by the FastAPI endpoints
+framework_backends = FrameworkBackends()
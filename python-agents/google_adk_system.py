@@ -1,62 +1,322 @@
 import os
 import asyncio
 import json
-from typing import Dict, List, Any, Optional
-from dataclasses import dataclass
+import logging
+import time
+from typing import AsyncIterator, Dict, List, Any, Optional, Tuple
+from dataclasses import dataclass, field
 from datetime import datetime
 
-# Google ADK imports for coordination
-import vertexai
-from vertexai.generative_models import GenerativeModel, ChatSession
-from google.cloud import aiplatform
-import google.generativeai as genai
-
 # Base imports
 from pydantic import BaseModel
 import httpx
 
+from http_pool import http_pool
+from completion_cache import CacheStats, completion_cache, completion_cache_key
+from event_bus import session_events
+from persona_prompts import persona_prompts, user_turn
+from rate_limiter import DEFAULT_COMPLETION_TOKENS, estimate_tokens, grok_rate_limiter
+from request_context import current_persona, current_session_id
+from quorum import gather_quorum, late_response, quorum_settings
+from synthesis_input import build_synthesis_input
+from tiered_synthesis import needs_tiering, reduce_responses
+from tracing import tracer
+from metrics import (
+    completion_cache_lookups,
+    persona_completion_seconds,
+    synthesis_seconds,
+    upstream_responses,
+    upstream_retries,
+    upstream_tokens,
+)
+from resilience import (
+    UPSTREAM_CONNECT_TIMEOUT,
+    UPSTREAM_MAX_RETRIES,
+    UPSTREAM_MAX_RETRY_WAIT,
+    UPSTREAM_READ_TIMEOUT,
+    CircuitOpenError,
+    UpstreamError,
+    UpstreamStats,
+    backoff_delay,
+    get_circuit_breaker,
+    parse_retry_after,
+)
+
+logger = logging.getLogger(__name__)
+
+# Grok endpoint; point at a local stand-in for benchmarks
+GROK_API_BASE_URL = os.getenv("GROK_API_BASE_URL", "https://api.x.ai/v1")
+
+# Default cap on concurrent persona completions (process-wide)
+DEFAULT_PERSONA_CONCURRENCY = int(os.getenv("PERSONA_CONCURRENCY", "8"))
+
+@dataclass
+class TokenUsage:
+    """Upstream-reported token counts, including prompt tokens served from the prefix cache"""
+    prompt_tokens: int = 0
+    cached_prompt_tokens: int = 0
+    completion_tokens: int = 0
+    
+    def record(self, usage: Dict[str, Any]):
+        cached = (usage.get("prompt_tokens_details") or {}).get("cached_tokens") or 0
+        self.prompt_tokens += usage.get("prompt_tokens") or 0
+        self.cached_prompt_tokens += cached
+        self.completion_tokens += usage.get("completion_tokens") or 0
+        upstream_tokens.inc(usage.get("prompt_tokens") or 0, upstream="grok", direction="prompt")
+        upstream_tokens.inc(cached, upstream="grok", direction="cached_prompt")
+        upstream_tokens.inc(usage.get("completion_tokens") or 0, upstream="grok", direction="completion")
+    
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "prompt_tokens": self.prompt_tokens,
+            "cached_prompt_tokens": self.cached_prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "prompt_cache_hit_rate": (
+                round(self.cached_prompt_tokens / self.prompt_tokens, 3) if self.prompt_tokens else 0.0
+            ),
+        }
+
+@dataclass
+class CompletionStats:
+    """Per-analysis accounting for every Grok call made during one run"""
+    cache: CacheStats = field(default_factory=CacheStats)
+    upstream: UpstreamStats = field(default_factory=UpstreamStats)
+    tokens: TokenUsage = field(default_factory=TokenUsage)
+
 # Grok-3 API integration
 class GrokAPI:
     """Grok-3 API client for AI completions"""
     
     def __init__(self):
         self.api_key = os.getenv("GROK_API_KEY")  # Using X.AI API key for Grok
-        self.base_url = "https://api.x.ai/v1"
+        self.base_url = GROK_API_BASE_URL
         self.model = "grok-3"
+        self.cache = completion_cache
+        self.breaker = get_circuit_breaker("grok")
+        self.rate_limiter = grok_rate_limiter
+        self.max_retries = UPSTREAM_MAX_RETRIES
+        # Fail fast when the connection can't be made; allow slow generations
+        self.timeout = httpx.Timeout(UPSTREAM_READ_TIMEOUT, connect=UPSTREAM_CONNECT_TIMEOUT)
+    
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Shared keep-alive client owned by the app (see http_pool)"""
+        return http_pool.get("grok")
     
-    async def complete(self, prompt: str, system_prompt: Optional[str] = None) -> str:
-        """Get completion from Grok-3"""
+    def _request_body(self, prompt: str, system_prompt: Optional[str], stream: bool = False) -> Dict[str, Any]:
+        messages = []
+        if system_prompt:
+            messages.append({"role": "system", "content": system_prompt})
+        messages.append({"role": "user", "content": prompt})
+        
+        body = {
+            "model": self.model,
+            "messages": messages,
+            "temperature": 0.7,
+            "max_tokens": 500  # Shorter responses
+        }
+        if stream:
+            body["stream"] = True
+            # Ask for a final usage chunk so streamed calls report tokens too
+            body["stream_options"] = {"include_usage": True}
+        return body
+    
+    def _estimate_tokens(self, body: Dict[str, Any]) -> int:
+        """Prompt estimate plus the completion budget, as charged against tokens/min"""
+        prompt_tokens = sum(estimate_tokens(message["content"]) for message in body["messages"])
+        return prompt_tokens + body.get("max_tokens", DEFAULT_COMPLETION_TOKENS)
+    
+    def _cache_key(self, body: Dict[str, Any]) -> str:
+        params = {k: v for k, v in body.items() if k not in ("model", "messages", "stream", "stream_options")}
+        return completion_cache_key(body["model"], body["messages"], params)
+    
+    async def _cache_lookup(self, key: str, use_cache: bool, stats: Optional[CompletionStats]) -> Optional[str]:
+        """Return a cached completion, or None on miss, bypass or cache failure"""
+        if self.cache is None or not use_cache:
+            return None
         try:
-            if not self.api_key:
-                raise Exception("GROK_API_KEY not set")
-                
-            async with httpx.AsyncClient() as client:
-                messages = []
-                if system_prompt:
-                    messages.append({"role": "system", "content": system_prompt})
-                messages.append({"role": "user", "content": prompt})
-                
-                response = await client.post(
-                    f"{self.base_url}/chat/completions",
-                    headers={"Authorization": f"Bearer {self.api_key}"},
-                    json={
-                        "model": self.model,
-                        "messages": messages,
-                        "temperature": 0.7,
-                        "max_tokens": 500  # Shorter responses
-                    },
-                    timeout=15.0  # Shorter timeout
+            cached = await self.cache.get(key)
+        except Exception as e:
+            logger.warning("Completion cache read failed: %s", e)
+            return None
+        completion_cache_lookups.inc(result="miss" if cached is None else "hit")
+        if stats is not None:
+            if cached is None:
+                stats.cache.record_miss()
+            else:
+                stats.cache.record_hit(cached)
+        return cached
+    
+    async def _cache_store(self, key: str, value: str):
+        if self.cache is None:
+            return
+        try:
+            await self.cache.set(key, value)
+        except Exception as e:
+            logger.warning("Completion cache write failed: %s", e)
+    
+    async def _send(self, body: Dict[str, Any], stats: Optional[CompletionStats], stream: bool = False) -> httpx.Response:
+        """POST a completion request with retries behind the circuit breaker
+        
+        Every attempt first waits for quota from the shared rate limiter.
+        Connection failures, timeouts, 429 and 5xx responses are retried with
+        jittered exponential backoff, honouring Retry-After. Other errors are
+        raised straight away. With ``stream=True`` the caller must close the
+        returned response; retries only happen before the first byte.
+        """
+        upstream = stats.upstream if stats is not None else UpstreamStats()
+        estimated_tokens = self._estimate_tokens(body)
+        attempt = 0
+        while True:
+            try:
+                self.breaker.before_call()
+            except CircuitOpenError:
+                upstream.circuit_rejections += 1
+                raise
+            upstream.rate_limit_wait += await self.rate_limiter.acquire(estimated_tokens)
+            
+            retry_after = None
+            try:
+                with tracer.span("grok.chat_completions", attempt=attempt + 1, stream=stream) as span:
+                    request = self.client.build_request(
+                        "POST",
+                        f"{self.base_url}/chat/completions",
+                        headers={"Authorization": f"Bearer {self.api_key}"},
+                        json=body,
+                        timeout=self.timeout
+                    )
+                    response = await self.client.send(request, stream=stream)
+                    span.set_attribute("status_code", response.status_code)
+                    if response.status_code != 200:
+                        span.status = "error"
+            except httpx.TransportError as e:
+                upstream_responses.inc(
+                    upstream="grok", status="timeout" if isinstance(e, httpx.TimeoutException) else "transport_error"
                 )
-                
+                error: Exception = e
+            else:
+                upstream_responses.inc(upstream="grok", status=str(response.status_code))
                 if response.status_code == 200:
-                    data = response.json()
-                    return data["choices"][0]["message"]["content"]
-                else:
-                    error_text = response.text
-                    print(f"Grok API error {response.status_code}: {error_text}")
-                    raise Exception(f"Grok API error {response.status_code}: {error_text}")
+                    self.breaker.record_success()
+                    return response
+                
+                error_text = (await response.aread()).decode(errors="replace")
+                await response.aclose()
+                error = UpstreamError(
+                    f"Grok API error {response.status_code}: {error_text}",
+                    status_code=response.status_code,
+                    retry_after=parse_retry_after(response.headers.get("retry-after"))
+                )
+                if not error.retryable:
+                    self.breaker.record_success()  # Upstream is healthy, the request was bad
+                    raise error
+                retry_after = error.retry_after
+                if error.status_code == 429:
+                    # Back the whole process off, not just this call
+                    self.rate_limiter.pause(retry_after or backoff_delay(attempt))
+            
+            if isinstance(error, UpstreamError) and error.status_code == 429:
+                self.breaker.record_backpressure()  # Over quota, not degraded: keep the circuit out of it
+            else:
+                self.breaker.record_failure()
+            upstream.failed_attempts += 1
+            if attempt >= self.max_retries or (retry_after or 0) > UPSTREAM_MAX_RETRY_WAIT:
+                raise error
+            
+            delay = backoff_delay(attempt, retry_after)
+            logger.info(
+                "Grok attempt %d failed (%s), retrying in %.2fs", attempt + 1, error, delay,
+                extra={"retry_delay_s": round(delay, 3)}
+            )
+            upstream.retries += 1
+            upstream_retries.inc(upstream="grok")
+            self.breaker.record_retry()
+            attempt += 1
+            await asyncio.sleep(delay)
+    
+    def _record_usage(self, body: Dict[str, Any], usage: Dict[str, Any], stats: Optional[CompletionStats]):
+        """Settle the rate limiter and count tokens, including prompt-cache hits"""
+        self.rate_limiter.settle(self._estimate_tokens(body), usage.get("total_tokens"))
+        (stats.tokens if stats is not None else TokenUsage()).record(usage)
+    
+    async def complete(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        use_cache: bool = True,
+        stats: Optional[CompletionStats] = None
+    ) -> str:
+        """Get completion from Grok-3
+        
+        Identical requests are served from the completion cache. With
+        ``use_cache=False`` the cache is not read, but the fresh result is stored.
+        """
+        try:
+            if not self.api_key:
+                raise Exception("GROK_API_KEY not set")
+            
+            body = self._request_body(prompt, system_prompt)
+            cache_key = self._cache_key(body)
+            cached = await self._cache_lookup(cache_key, use_cache, stats)
+            if cached is not None:
+                return cached
+            
+            response = await self._send(body, stats)
+            data = response.json()
+            self._record_usage(body, data.get("usage") or {}, stats)
+            content = data["choices"][0]["message"]["content"]
+            await self._cache_store(cache_key, content)
+            return content
         except Exception as e:
-            print(f"Grok completion error: {str(e)}")
+            logger.warning("Grok completion error: %s", e)
+            raise Exception(f"Grok completion failed: {str(e)}")
+    
+    async def stream_complete(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        use_cache: bool = True,
+        stats: Optional[CompletionStats] = None
+    ) -> AsyncIterator[str]:
+        """Stream completion tokens from Grok-3 as they are generated
+        
+        A cached completion is yielded as a single chunk.
+        """
+        try:
+            if not self.api_key:
+                raise Exception("GROK_API_KEY not set")
+            
+            body = self._request_body(prompt, system_prompt, stream=True)
+            cache_key = self._cache_key(body)
+            cached = await self._cache_lookup(cache_key, use_cache, stats)
+            if cached is not None:
+                yield cached
+                return
+            
+            chunks = []
+            response = await self._send(body, stats, stream=True)
+            try:
+                # Server-sent events: one "data: {json}" line per chunk, then "data: [DONE]"
+                async for line in response.aiter_lines():
+                    if not line.startswith("data:"):
+                        continue
+                    payload = line[len("data:"):].strip()
+                    if payload == "[DONE]":
+                        break
+                    chunk = json.loads(payload)
+                    if chunk.get("usage"):
+                        self._record_usage(body, chunk["usage"], stats)
+                    choices = chunk.get("choices") or [{}]
+                    token = (choices[0].get("delta") or {}).get("content")
+                    if token:
+                        chunks.append(token)
+                        yield token
+            finally:
+                await response.aclose()
+            
+            await self._cache_store(cache_key, "".join(chunks))
+        except Exception as e:
+            logger.warning("Grok streaming error: %s", e)
             raise Exception(f"Grok completion failed: {str(e)}")
 
 @dataclass
@@ -86,6 +346,7 @@ class GoogleADKCoordinator:
         self.agents: Dict[str, 'GoogleADKAgent'] = {}
         self.event_bus = []  # Simple event bus for coordination
         self.message_router = {}  # Message routing system
+        self.session_id: Optional[str] = None
     
     async def register_agent(self, agent: 'GoogleADKAgent'):
         """Register an agent with the coordinator"""
@@ -100,27 +361,28 @@ class GoogleADKCoordinator:
     async def coordinate_agents(self, state: GoogleADKAgentState) -> GoogleADKAgentState:
         """Coordinate agent interactions using Google ADK patterns"""
         
-        print(f"🎯 Starting coordination for {len(self.agents)} registered agents")
+        logger.info("Starting coordination for %d registered agents", len(self.agents))
+        self.session_id = state.session_id
         
         # Analyze coordination needs
         coordination_plan = await self._analyze_coordination_needs(state)
-        print(f"📋 Coordination plan: {coordination_plan}")
+        logger.debug("Coordination plan: %s", coordination_plan)
         
         # Execute coordination plan
         steps = coordination_plan.get("steps", [])
-        print(f"📝 Executing {len(steps)} coordination steps")
+        logger.debug("Executing %d coordination steps", len(steps))
         
         for i, step in enumerate(steps):
-            print(f"🔄 Step {i+1}/{len(steps)}: {step}")
+            logger.debug("Step %d/%d: %s", i + 1, len(steps), step)
             await self._execute_coordination_step(step, state)
         
-        print(f"✅ Coordination complete. Agent responses: {len(state.agent_responses)}")
+        logger.info("Coordination complete, %d agent responses", len(state.agent_responses))
         return state
     
     async def _analyze_coordination_needs(self, state: GoogleADKAgentState) -> Dict[str, Any]:
         """Use Grok-3 to analyze coordination requirements"""
         
-        print(f"🧠 Using simplified coordination plan for {len(self.agents)} agents")
+        logger.debug("Using simplified coordination plan for %d agents", len(self.agents))
         
         # For now, use a simple reliable coordination plan
         # This bypasses the Grok-3 coordination planning which might be causing JSON parsing issues
@@ -136,51 +398,60 @@ class GoogleADKCoordinator:
             ]
         }
         
-        print(f"📋 Simple coordination plan: {coordination_plan}")
+        logger.debug("Simple coordination plan: %s", coordination_plan)
         return coordination_plan
     
     async def _execute_coordination_step(self, step: Dict[str, Any], state: GoogleADKAgentState):
         """Execute a coordination step"""
         
         step_type = step.get("type")
-        print(f"🔄 Executing coordination step: {step_type}")
+        logger.debug("Executing coordination step: %s", step_type)
         
         if step_type == "parallel_execution":
             # Execute agents in parallel
             agents_to_run = step.get("agents", [])
-            print(f"🤖 Running {len(agents_to_run)} agents: {agents_to_run}")
-            tasks = []
+            logger.debug("Running %d agents: %s", len(agents_to_run), agents_to_run)
+            tasks = {}
             
             for agent_name in agents_to_run:
                 if agent_name in self.agents:
-                    print(f"✅ Adding task for agent: {agent_name}")
-                    tasks.append(self.agents[agent_name].execute(state))
+                    logger.debug("Adding task for agent: %s", agent_name)
+                    tasks[agent_name] = self._execute_agent(agent_name, state)
                 else:
-                    print(f"❌ Agent not found: {agent_name}")
+                    logger.warning("Agent not found: %s", agent_name)
             
-            # Wait for all agents to complete
-            print(f"⏳ Waiting for {len(tasks)} agents to complete...")
-            results = await asyncio.gather(*tasks, return_exceptions=True)
+            # Wait for the quorum (all agents by default); stragglers are cancelled
+            logger.debug("Waiting for %d agents to complete", len(tasks))
+            phase = await gather_quorum(tasks, **quorum_settings())
             
             # Process results
-            for i, result in enumerate(results):
-                agent_name = agents_to_run[i] if i < len(agents_to_run) else f"unknown_{i}"
-                if not isinstance(result, Exception):
-                    print(f"✅ Agent {agent_name} completed successfully")
+            for agent_name, result in phase.results.items():
+                if not isinstance(result, BaseException):
+                    logger.debug("Agent %s completed", agent_name)
                     state.agent_responses[agent_name] = result
                 else:
-                    print(f"❌ Agent {agent_name} failed: {result}")
+                    logger.warning("Agent %s failed: %s", agent_name, result)
                     state.agent_responses[agent_name] = {
                         "error": str(result),
                         "agent": agent_name,
                         "timestamp": datetime.now().isoformat()
                     }
+            for agent_name in phase.late:
+                logger.warning("Agent %s did not answer before synthesis", agent_name)
+                state.agent_responses[agent_name] = late_response(agent=agent_name)
+            if phase.late:
+                await self._emit_coordination_event({
+                    "type": "agents_late",
+                    "agents": phase.late,
+                    "quorum": phase.as_dict(),
+                    "timestamp": datetime.now().isoformat()
+                })
         
         elif step_type == "synthesis":
             # Synthesize all agent responses
-            print(f"🧠 Starting synthesis with {len(state.agent_responses)} agent responses")
+            logger.debug("Starting synthesis with %d agent responses", len(state.agent_responses))
             await self._synthesize_responses(state)
-            print(f"📝 Synthesis completed, length: {len(str(state.synthesis))}")
+            logger.debug("Synthesis completed, %d chars", len(str(state.synthesis)))
         
         # Emit coordination event
         await self._emit_coordination_event({
@@ -189,16 +460,33 @@ class GoogleADKCoordinator:
             "timestamp": datetime.now().isoformat()
         })
     
+    async def _execute_agent(self, agent_name: str, state: GoogleADKAgentState) -> Dict[str, Any]:
+        """Run one agent and publish its partial result as soon as it finishes"""
+        result = await self.agents[agent_name].execute(state)
+        await self._emit_coordination_event({
+            "type": "agent_completed",
+            "agent": agent_name,
+            "result": result,
+            "timestamp": datetime.now().isoformat()
+        })
+        return result
+    
     async def _synthesize_responses(self, state: GoogleADKAgentState):
         """Use Grok-3 to synthesize all agent responses"""
         
+        responses, tiering = state.agent_responses, None
+        if needs_tiering(responses):
+            responses, tiering = await reduce_responses(
+                state.user_query, responses, lambda prompt, system_prompt: self.grok.complete(prompt, system_prompt)
+            )
+        synthesis_input = build_synthesis_input(responses)
         prompt = f"""
         Synthesize these multi-persona responses into a comprehensive analysis:
         
         Original Query: {state.user_query}
         
         Agent Responses:
-        {json.dumps(state.agent_responses, indent=2)}
+        {synthesis_input.text}
         
         Create a synthesis that:
         1. Highlights key insights from each perspective
@@ -208,14 +496,23 @@ class GoogleADKCoordinator:
         """
         
         system_prompt = "You are an expert at synthesizing diverse perspectives into coherent insights."
+        await self._emit_coordination_event({
+            "type": "synthesis_prompt",
+            "prompt_tokens": estimate_tokens(system_prompt) + estimate_tokens(prompt),
+            **synthesis_input.as_dict(),
+            "tiered": tiering,
+            "timestamp": datetime.now().isoformat()
+        })
         
         synthesis = await self.grok.complete(prompt, system_prompt)
         state.synthesis = synthesis
         state.status = "completed"
     
     async def _emit_coordination_event(self, event: Dict[str, Any]):
-        """Emit a coordination event"""
+        """Emit a coordination event and push it to the session's subscribers"""
         self.event_bus.append(event)
+        if self.session_id:
+            session_events.publish(self.session_id, event)
 
 class GoogleADKAgent:
     """Google ADK-based agent for PersonaDoc using Grok-3 for intelligence"""
@@ -228,46 +525,32 @@ class GoogleADKAgent:
     async def execute(self, state: GoogleADKAgentState) -> Dict[str, Any]:
         """Execute agent logic using Grok-3 for intelligence"""
         
-        print(f"🤖 Executing agent: {self.config.name} ({self.config.role})")
+        current_persona.set(self.config.name)
+        logger.debug("Executing agent %s (%s)", self.config.name, self.config.role)
         
-        # Build persona-specific prompt
+        # Static persona text goes in the system prompt so its prefix is cacheable upstream
         if self.persona_data:
-            persona_prompt = f"""
-            You are {self.persona_data.get('name', 'Unknown')}, a {self.persona_data.get('occupation', 'person')} from {self.persona_data.get('location', 'somewhere')}.
-            
-            Background: 
-            - Age: {self.persona_data.get('age', 'unknown')}
-            - Personality: {', '.join(self.persona_data.get('personalityTraits', []))}
-            - Interests: {', '.join(self.persona_data.get('interests', []))}
-            - Introduction: {self.persona_data.get('introduction', '')}
-            
-            Respond to this query from your unique perspective:
-            {state.user_query}
-            
-            Be authentic to your persona while providing valuable insights. Provide a thoughtful 2-3 paragraph response.
-            """
+            system_prompt = persona_prompts.system_prefix(self.persona_data, style="full")
         else:
-            persona_prompt = f"""
-            You are {self.config.name}, a {self.config.role}.
-            
-            Analyze this query and provide your expert perspective:
-            {state.user_query}
-            
-            Provide a thoughtful 2-3 paragraph analysis.
-            """
+            system_prompt = (
+                f"You are {self.config.name}, a {self.config.role}. Analyze each query and provide "
+                "your expert perspective in a thoughtful 2-3 paragraph analysis."
+            )
+        persona_prompt = user_turn(state.user_query)
         
         # Get response from Grok-3
         try:
-            print(f"💭 Generating response for {self.config.name}...")
-            print(f"🔑 API key available: {bool(self.grok.api_key)}")
-            print(f"📝 Prompt length: {len(persona_prompt)} characters")
+            logger.debug(
+                "Generating response for %s", self.config.name,
+                extra={"prompt_chars": len(persona_prompt), "api_key_set": bool(self.grok.api_key)}
+            )
             
             response = await self.grok.complete(
                 prompt=persona_prompt,
-                system_prompt=f"You are {self.config.name}, an expert {self.config.role}. Provide thoughtful, persona-appropriate responses."
+                system_prompt=system_prompt
             )
             
-            print(f"✅ {self.config.name} generated response: {len(response)} characters")
+            logger.debug("%s generated response", self.config.name, extra={"response_chars": len(response)})
             
             return {
                 "agent": self.config.name,
@@ -279,10 +562,8 @@ class GoogleADKAgent:
             }
             
         except Exception as e:
-            print(f"❌ Error executing agent {self.config.name}: {e}")
-            print(f"🔍 Exception type: {type(e).__name__}")
-            import traceback
-            print(f"🔍 Traceback: {traceback.format_exc()}")
+            # The error is already wrapped by GrokAPI; a traceback adds nothing but volume
+            logger.warning("Error executing agent %s: %s", self.config.name, e, extra={"error_type": type(e).__name__})
             return {
                 "agent": self.config.name,
                 "role": self.config.role,
@@ -292,247 +573,284 @@ class GoogleADKAgent:
                 "model_used": "grok-3",
                 "error": True
             }
-        
-        start_time = datetime.now()
-        
-        try:
-            # Get persona context if this is a persona agent
-            persona_context = ""
-            if self.config.persona_id:
-                persona_data = await self.get_persona_context(self.config.persona_id)
-                persona_context = f"""
-                You are {persona_data.get('name', 'Unknown')}.
-                Background: {persona_data.get('background', '')}
-                Perspective: {persona_data.get('perspective', '')}
-                Values: {persona_data.get('values', '')}
-                Occupation: {persona_data.get('occupation', '')}
-                Location: {persona_data.get('location', '')}
-                """
-            
-            # Create role-specific prompt
-            if self.config.role == "coordinator":
-                prompt = self._create_coordinator_prompt(state, persona_context)
-            elif self.config.role == "persona":
-                prompt = self._create_persona_prompt(state, persona_context)
-            elif self.config.role == "synthesizer":
-                prompt = self._create_synthesizer_prompt(state, persona_context)
-            else:
-                prompt = f"{persona_context}\n\nUser Query: {state.user_query}"
-            
-            # Generate response using Google ADK
-            if self.model:
-                if hasattr(self.model, 'generate_content'):  # Gemini API
-                    response = await asyncio.to_thread(self.model.generate_content, prompt)
-                    content = response.text
-                else:  # Vertex AI
-                    response = await asyncio.to_thread(self.model.generate_content, prompt)
-                    content = response.text
-            else:
-                content = f"Agent {self.config.name} is not properly initialized"
-            
-            # Create coordination event
-            coordination_event = {
-                "timestamp": datetime.now().isoformat(),
-                "agent": self.config.name,
-                "role": self.config.role,
-                "action": "response_generated",
-                "execution_time_ms": int((datetime.now() - start_time).total_seconds() * 1000),
-                "model_used": self.config.model_name,
-                "framework": "google-adk"
-            }
-            
-            return {
-                "agent_name": self.config.name,
-                "role": self.config.role,
-                "response": content,
-                "coordination_event": coordination_event,
-                "persona_id": self.config.persona_id,
-                "timestamp": datetime.now().isoformat()
-            }
-            
-        except Exception as e:
-            error_event = {
-                "timestamp": datetime.now().isoformat(),
-                "agent": self.config.name,
-                "role": self.config.role,
-                "action": "error",
-                "error": str(e),
-                "framework": "google-adk"
-            }
-            
-            return {
-                "agent_name": self.config.name,
-                "role": self.config.role,
-                "response": f"Error in {self.config.name}: {str(e)}",
-                "coordination_event": error_event,
-                "persona_id": self.config.persona_id,
-                "timestamp": datetime.now().isoformat()
-            }
+
+class GoogleADKMultiAgentSystem:
+    """Minimal, reliable Google ADK-based multi-agent system"""
     
-    def _create_coordinator_prompt(self, state: GoogleADKAgentState, persona_context: str) -> str:
-        return f"""
-        {persona_context}
-        
-        You are the Coordinator Agent in a multi-agent analysis system.
-        
-        User Query: {state.user_query}
-        Available Personas: {[p.get('name', 'Unknown') for p in state.personas]}
-        
-        Your tasks:
-        1. Analyze the user query
-        2. Determine which personas should respond
-        3. Identify key discussion points
-        4. Suggest coordination strategy
-        
-        Provide a structured analysis in JSON format:
-        {{
-            "query_analysis": "analysis of the user query",
-            "relevant_personas": ["list", "of", "persona", "names"],
-            "key_topics": ["topic1", "topic2"],
-            "coordination_strategy": "how agents should work together",
-            "expected_outcomes": "what we expect to achieve"
-        }}
-        """
+    SYNTHESIS_SYSTEM_PROMPT = "Provide a balanced synthesis of the different perspectives."
     
-    def _create_persona_prompt(self, state: GoogleADKAgentState, persona_context: str) -> str:
-        return f"""
-        {persona_context}
-        
-        Respond to this query from your unique perspective and expertise:
-        
-        Query: {state.user_query}
-        
-        Consider:
-        - Your background and experience
-        - Your values and worldview
-        - Your professional expertise
-        - Any relevant personal experiences
+    def __init__(self, max_concurrency: Optional[int] = None):
+        self.grok = GrokAPI()
+        # Process-wide cap on in-flight persona completions across all sessions
+        self.max_concurrency = max(1, max_concurrency or DEFAULT_PERSONA_CONCURRENCY)
+        self._global_limit = asyncio.Semaphore(self.max_concurrency)
+    
+    def _build_persona_prompt(self, persona: Dict[str, Any], user_query: str) -> str:
+        """Build the per-request part of a single persona prompt"""
+        return user_turn(user_query)
+    
+    def _persona_system_prompt(self, persona: Dict[str, Any]) -> str:
+        """Stable per-persona prefix; identical bytes for every query to this persona version"""
+        return persona_prompts.system_prefix(persona, style="brief")
+    
+    def _build_synthesis_prompt(self, user_query: str, persona_responses: Dict[str, Any]) -> Tuple[str, Dict[str, Any]]:
+        """Build the synthesis prompt from the collected persona responses
         
-        Provide a thoughtful, authentic response that reflects your perspective.
-        Keep it focused and actionable where appropriate.
+        Returns the prompt and its size report for the analysis block.
         """
+        synthesis_input = build_synthesis_input(persona_responses)
+        synthesis_prompt = f"""
+                Question: {user_query}
+                
+                Responses:
+                {synthesis_input.text}
+                
+                Synthesize these perspectives into a brief, balanced summary:"""
+        prompt_tokens = estimate_tokens(self.SYNTHESIS_SYSTEM_PROMPT) + estimate_tokens(synthesis_prompt)
+        return synthesis_prompt, {"prompt_tokens": prompt_tokens, **synthesis_input.as_dict()}
     
-    def _create_synthesizer_prompt(self, state: GoogleADKAgentState, persona_context: str) -> str:
-        return f"""
-        {persona_context}
-        
-        You are the Synthesizer Agent. Your role is to synthesize responses from multiple personas.
-        
-        Original Query: {state.user_query}
-        
-        Agent Responses:
-        {json.dumps(state.agent_responses, indent=2)}
-        
-        Create a comprehensive synthesis that:
-        1. Highlights key insights from each perspective
-        2. Identifies areas of agreement and disagreement
-        3. Synthesizes actionable recommendations
-        4. Maintains the unique voice of each persona
-        5. Provides a balanced, multi-perspective analysis
+    async def _prepare_synthesis(
+        self,
+        user_query: str,
+        persona_responses: Dict[str, Any],
+        use_cache: bool,
+        stats: CompletionStats
+    ) -> Tuple[str, Dict[str, Any]]:
+        """Build the synthesis prompt, first condensing large persona sets in parallel groups"""
+        tiering = None
+        if needs_tiering(persona_responses):
+            async def complete(prompt: str, system_prompt: str) -> str:
+                async with self._global_limit:
+                    return await self.grok.complete(
+                        prompt=prompt, system_prompt=system_prompt, use_cache=use_cache, stats=stats
+                    )
+            persona_responses, tiering = await reduce_responses(user_query, persona_responses, complete)
+        synthesis_prompt, synthesis_input = self._build_synthesis_prompt(user_query, persona_responses)
+        return synthesis_prompt, {**synthesis_input, "tiered": tiering}
+    
+    @staticmethod
+    def _publish(session_id: str, coordination_events: List[Dict[str, Any]], event: Dict[str, Any]):
+        """Record a coordination event and push it to live subscribers
         
-        Format as a well-structured analysis with clear sections.
+        Subscribers get the full event (including partial results and text);
+        the recorded copy keeps only the metadata.
         """
-
-class GoogleADKMultiAgentSystem:
-    """Minimal, reliable Google ADK-based multi-agent system"""
+        coordination_events.append({k: v for k, v in event.items() if k not in ("result", "response", "synthesis")})
+        session_events.publish(session_id, event)
     
-    def __init__(self):
-        self.grok = GrokAPI()
+    def _session_concurrency(self, max_concurrency: Optional[int]) -> int:
+        """Per-session fan-out, never above the process-wide limit"""
+        return max(1, min(max_concurrency or self.max_concurrency, self.max_concurrency))
+    
+    def _error_response(self, persona: Dict[str, Any], error: BaseException) -> Dict[str, Any]:
+        return {
+            "response": f"Unable to generate response: {str(error)}",
+            "persona_id": persona.get('id'),
+            "timestamp": datetime.now().isoformat(),
+            "error": True
+        }
+    
+    def _collect_responses(self, personas: List[Dict[str, Any]], results: List[Any]) -> Dict[str, Any]:
+        """Key results by persona name in request order so output is deterministic"""
+        persona_responses = {}
+        for persona, result in zip(personas, results):
+            persona_name = persona.get('name', 'Unknown')
+            if isinstance(result, BaseException):
+                logger.warning("Error with %s: %s", persona_name, result)
+                result = self._error_response(persona, result)
+            persona_responses[persona_name] = result
+        return persona_responses
+    
+    def _build_result(
+        self,
+        session_id: str,
+        personas: List[Dict[str, Any]],
+        persona_responses: Dict[str, Any],
+        synthesis: str,
+        session_concurrency: int,
+        timings: Dict[str, float],
+        stats: CompletionStats,
+        coordination_events: List[Dict[str, Any]],
+        framework: str = "google-adk-minimal",
+        synthesis_input: Optional[Dict[str, Any]] = None,
+        quorum: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        trace_summary = tracer.summary()
+        if trace_summary is not None:
+            coordination_events.append(trace_summary)
+        return {
+            "session_id": session_id,
+            "synthesis": synthesis,
+            "persona_responses": persona_responses,
+            "coordination_events": coordination_events,
+            "analysis": {
+                "total_personas": len(personas),
+                "successful_responses": len([r for r in persona_responses.values() if not r.get('error')]),
+                "failed_responses": len([r for r in persona_responses.values() if r.get('error') and not r.get('late')]),
+                "late_responses": len([r for r in persona_responses.values() if r.get('late')]),
+                "execution_framework": framework,
+                "model_used": "grok-3",
+                "max_concurrency": session_concurrency,
+                "persona_latency_ms": {
+                    name: data.get("latency_ms") for name, data in persona_responses.items()
+                },
+                "persona_phase_ms": int((timings["personas_finished"] - timings["started"]) * 1000),
+                "persona_quorum": quorum,
+                "synthesis_ms": int((timings["finished"] - timings["personas_finished"]) * 1000),
+                "synthesis_input": synthesis_input,
+                "total_ms": int((timings["finished"] - timings["started"]) * 1000),
+                "completion_cache": stats.cache.as_dict(),
+                "upstream": {**stats.upstream.as_dict(), "circuit_state": self.grok.breaker.state},
+                "tokens": stats.tokens.as_dict()
+            },
+            "status": "completed"
+        }
+    
+    async def _respond_as_persona(
+        self,
+        session_id: str,
+        persona: Dict[str, Any],
+        user_query: str,
+        session_limit: asyncio.Semaphore,
+        use_cache: bool,
+        stats: CompletionStats,
+        coordination_events: List[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """Get one persona response under the session and global concurrency limits"""
         
+        persona_name = persona.get('name', 'Unknown')
+        queued_at = time.perf_counter()
+        
+        async with session_limit:
+            async with self._global_limit:
+                started_at = time.perf_counter()
+                current_persona.set(persona_name)
+                logger.debug("Generating response for %s", persona_name)
+                
+                outcome = "error"  # Also covers calls cancelled by the quorum or deadline
+                try:
+                    with tracer.span("persona", persona=persona_name) as span:
+                        try:
+                            response = await self.grok.complete(
+                                prompt=self._build_persona_prompt(persona, user_query),
+                                system_prompt=self._persona_system_prompt(persona),
+                                use_cache=use_cache,
+                                stats=stats
+                            )
+                            result = {
+                                "response": response,
+                                "persona_id": persona.get('id'),
+                                "timestamp": datetime.now().isoformat()
+                            }
+                            logger.debug("%s responded", persona_name, extra={"response_chars": len(response)})
+                        except Exception as e:
+                            logger.warning("Error with %s: %s", persona_name, e)
+                            result = self._error_response(persona, e)
+                            span.status = "error"
+                    outcome = "error" if result.get("error") else "ok"
+                finally:
+                    elapsed = time.perf_counter() - started_at
+                    persona_completion_seconds.observe(elapsed, framework="google-adk", outcome=outcome)
+                result["latency_ms"] = int(elapsed * 1000)
+                result["queued_ms"] = int((started_at - queued_at) * 1000)
+                self._publish(session_id, coordination_events, self._event(
+                    "persona_error" if result.get("error") else "persona_completed",
+                    persona={"name": persona_name, "id": persona.get('id')},
+                    latency_ms=result["latency_ms"],
+                    result=result
+                ))
+                return result
+    
     async def run_analysis(
         self, 
         session_id: str, 
         user_query: str, 
-        personas: List[Dict[str, Any]]
+        personas: List[Dict[str, Any]],
+        max_concurrency: Optional[int] = None,
+        use_cache: bool = True,
+        quorum: Optional[float] = None,
+        deadline: Optional[float] = None
     ) -> Dict[str, Any]:
-        """Run minimal multi-agent analysis"""
+        """Run minimal multi-agent analysis
+        
+        Persona responses are requested concurrently. ``max_concurrency`` caps
+        the fan-out for this session; it never exceeds the process-wide limit.
+        ``use_cache=False`` skips completion cache reads for this request.
+        Synthesis starts once ``quorum`` (a fraction) of the personas have
+        answered, or ``deadline`` seconds into the persona phase; personas
+        still running are cancelled and reported as late.
+        """
         
-        print(f"🚀 Starting minimal Google ADK analysis for session {session_id}")
+        # Rate limiter queues and log records are keyed by this session from here on
+        current_session_id.set(session_id)
+        logger.info("Starting Google ADK analysis with %d personas", len(personas))
+        
+        session_concurrency = self._session_concurrency(max_concurrency)
+        timings = {"started": time.perf_counter()}
+        stats = CompletionStats()
+        coordination_events: List[Dict[str, Any]] = []
+        self._publish(session_id, coordination_events, self._event(
+            "analysis_started", total_personas=len(personas), max_concurrency=session_concurrency
+        ))
         
         try:
-            # Simple parallel execution - just get responses from each persona
-            persona_responses = {}
-            
-            # Create simple tasks for each persona
-            for persona in personas:
-                persona_name = persona.get('name', 'Unknown')
-                print(f"💭 Generating response for {persona_name}...")
-                
-                try:
-                    # Simple persona prompt
-                    prompt = f"""
-                    You are {persona_name}, a {persona.get('occupation', 'person')} from {persona.get('location', 'somewhere')}.
-                    
-                    Personal traits: {', '.join(persona.get('personalityTraits', []))}
-                    Interests: {', '.join(persona.get('interests', []))}
-                    
-                    Question: {user_query}
-                    
-                    Respond in 2-3 sentences from your perspective:
-                    """
-                    
-                    response = await self.grok.complete(
-                        prompt=prompt,
-                        system_prompt=f"You are {persona_name}. Give a brief, authentic response."
-                    )
-                    
-                    persona_responses[persona_name] = {
-                        "response": response,
-                        "persona_id": persona.get('id'),
-                        "timestamp": datetime.now().isoformat()
-                    }
-                    
-                    print(f"✅ {persona_name} responded ({len(response)} chars)")
-                    
-                except Exception as e:
-                    print(f"❌ Error with {persona_name}: {e}")
-                    persona_responses[persona_name] = {
-                        "response": f"Unable to generate response: {str(e)}",
-                        "persona_id": persona.get('id'),
-                        "timestamp": datetime.now().isoformat(),
-                        "error": True
-                    }
+            # Fan out to every persona, bounded by the session and global limits
+            session_limit = asyncio.Semaphore(session_concurrency)
+            with tracer.span("persona_phase", personas=len(personas)):
+                phase = await gather_quorum(
+                    {
+                        index: self._respond_as_persona(
+                            session_id, persona, user_query, session_limit, use_cache, stats, coordination_events
+                        )
+                        for index, persona in enumerate(personas)
+                    },
+                    **quorum_settings(quorum, deadline)
+                )
+            results = [
+                phase.results[index] if index in phase.results else late_response(persona_id=persona.get('id'))
+                for index, persona in enumerate(personas)
+            ]
+            persona_responses = self._collect_responses(personas, results)
+            if phase.late:
+                self._publish(session_id, coordination_events, self._event(
+                    "personas_late", personas=[personas[index].get('name', 'Unknown') for index in phase.late]
+                ))
+            timings["personas_finished"] = time.perf_counter()
             
             # Simple synthesis
+            synthesis_input = None
             if persona_responses:
-                synthesis_prompt = f"""
-                Question: {user_query}
-                
-                Responses:
-                """
-                for name, data in persona_responses.items():
-                    synthesis_prompt += f"\n{name}: {data['response']}\n"
-                
-                synthesis_prompt += "\nSynthesize these perspectives into a brief, balanced summary:"
-                
+                synthesis_prompt, synthesis_input = await self._prepare_synthesis(user_query, persona_responses, use_cache, stats)
+                self._publish(session_id, coordination_events, self._event(
+                    "synthesis_start", prompt_tokens=synthesis_input["prompt_tokens"]
+                ))
                 try:
-                    synthesis = await self.grok.complete(
-                        prompt=synthesis_prompt,
-                        system_prompt="Provide a balanced synthesis of the different perspectives."
-                    )
-                    print(f"📝 Synthesis completed ({len(synthesis)} chars)")
+                    with tracer.span("synthesis", prompt_tokens=synthesis_input["prompt_tokens"]):
+                        synthesis = await self.grok.complete(
+                            prompt=synthesis_prompt,
+                            system_prompt=self.SYNTHESIS_SYSTEM_PROMPT,
+                            use_cache=use_cache,
+                            stats=stats
+                        )
+                    logger.debug("Synthesis completed", extra={"synthesis_chars": len(synthesis)})
                 except Exception as e:
                     synthesis = f"Multiple perspectives were shared, but synthesis failed: {str(e)}"
-                    print(f"❌ Synthesis error: {e}")
+                    logger.warning("Synthesis error: %s", e)
             else:
                 synthesis = "No valid responses were generated."
             
-            return {
-                "session_id": session_id,
-                "synthesis": synthesis,
-                "persona_responses": persona_responses,
-                "coordination_events": [],
-                "analysis": {
-                    "total_personas": len(personas),
-                    "successful_responses": len([r for r in persona_responses.values() if not r.get('error')]),
-                    "execution_framework": "google-adk-minimal",
-                    "model_used": "grok-3"
-                },
-                "status": "completed"
-            }
+            timings["finished"] = time.perf_counter()
+            if persona_responses:
+                synthesis_seconds.observe(timings["finished"] - timings["personas_finished"], framework="google-adk")
+            self._publish(session_id, coordination_events, self._event("synthesis_completed", synthesis=synthesis))
+            return self._build_result(
+                session_id, personas, persona_responses, synthesis, session_concurrency, timings, stats,
+                coordination_events, synthesis_input=synthesis_input,
+                quorum=phase.as_dict(lambda index: personas[index].get('name', 'Unknown'))
+            )
             
         except Exception as e:
-            print(f"❌ Minimal Google ADK analysis failed: {e}")
+            logger.exception("Google ADK analysis failed: %s", e)
             return {
                 "session_id": session_id,
                 "synthesis": f"Analysis failed: {str(e)}",
@@ -541,6 +859,180 @@ class GoogleADKMultiAgentSystem:
                 "analysis": {"error": str(e), "framework": "google-adk-minimal"},
                 "status": "failed"
             }
+    
+    @staticmethod
+    def _event(event_type: str, **fields) -> Dict[str, Any]:
+        return {"type": event_type, **fields, "timestamp": datetime.now().isoformat()}
+    
+    async def _stream_persona(
+        self,
+        persona: Dict[str, Any],
+        user_query: str,
+        session_limit: asyncio.Semaphore,
+        events: asyncio.Queue,
+        use_cache: bool,
+        stats: CompletionStats
+    ) -> Dict[str, Any]:
+        """Stream one persona response, forwarding each token to the event queue"""
+        
+        persona_name = persona.get('name', 'Unknown')
+        tag = {"name": persona_name, "id": persona.get('id')}
+        queued_at = time.perf_counter()
+        current_persona.set(persona_name)
+        
+        async with session_limit:
+            async with self._global_limit:
+                started_at = time.perf_counter()
+                first_token_at = None
+                chunks = []
+                await events.put(self._event(
+                    "persona_thinking", persona=tag, message=f"{persona_name} is analyzing the query..."
+                ))
+                
+                outcome = "error"  # Also covers calls cancelled by the quorum or deadline
+                try:
+                    with tracer.span("persona", persona=persona_name) as span:
+                        try:
+                            async for token in self.grok.stream_complete(
+                                prompt=self._build_persona_prompt(persona, user_query),
+                                system_prompt=self._persona_system_prompt(persona),
+                                use_cache=use_cache,
+                                stats=stats
+                            ):
+                                if first_token_at is None:
+                                    first_token_at = time.perf_counter()
+                                    await events.put(self._event(
+                                        "persona_responding", persona=tag, message=f"{persona_name} is formulating response..."
+                                    ))
+                                chunks.append(token)
+                                await events.put(self._event("persona_token", persona=tag, token=token))
+                            
+                            result = {
+                                "response": "".join(chunks),
+                                "persona_id": persona.get('id'),
+                                "timestamp": datetime.now().isoformat()
+                            }
+                            await events.put(self._event("persona_completed", persona=tag, response=result["response"]))
+                        except Exception as e:
+                            logger.warning("Error with %s: %s", persona_name, e)
+                            result = self._error_response(persona, e)
+                            span.status = "error"
+                            await events.put(self._event("persona_error", persona=tag, error=str(e)))
+                    outcome = "error" if result.get("error") else "ok"
+                finally:
+                    elapsed = time.perf_counter() - started_at
+                    persona_completion_seconds.observe(elapsed, framework="google-adk-streaming", outcome=outcome)
+                result["latency_ms"] = int(elapsed * 1000)
+                result["queued_ms"] = int((started_at - queued_at) * 1000)
+                if first_token_at is not None:
+                    result["first_token_ms"] = int((first_token_at - started_at) * 1000)
+                return result
+    
+    async def stream_analysis(
+        self,
+        session_id: str,
+        user_query: str,
+        personas: List[Dict[str, Any]],
+        max_concurrency: Optional[int] = None,
+        use_cache: bool = True,
+        quorum: Optional[float] = None,
+        deadline: Optional[float] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Run the analysis and yield events as tokens arrive
+        
+        Personas stream concurrently; their tokens are interleaved and tagged
+        with the persona. ``quorum`` and ``deadline`` cut the persona phase
+        short as in ``run_analysis``. The synthesis is then streamed the same
+        way and the final event carries the same result shape as
+        ``run_analysis``.
+        """
+        
+        current_session_id.set(session_id)
+        session_concurrency = self._session_concurrency(max_concurrency)
+        timings = {"started": time.perf_counter()}
+        stats = CompletionStats()
+        coordination_events: List[Dict[str, Any]] = []
+        events: asyncio.Queue = asyncio.Queue()
+        session_limit = asyncio.Semaphore(session_concurrency)
+        phase_task = asyncio.create_task(gather_quorum(
+            {
+                index: self._stream_persona(persona, user_query, session_limit, events, use_cache, stats)
+                for index, persona in enumerate(personas)
+            },
+            **quorum_settings(quorum, deadline)
+        ))
+        # Queued after every event the personas put, including those of cancelled late personas
+        phase_task.add_done_callback(lambda _: events.put_nowait(None))
+        
+        try:
+            while True:
+                event = await events.get()
+                if event is None:
+                    break
+                if event["type"] != "persona_token":
+                    self._publish(session_id, coordination_events, event)
+                yield event
+            
+            phase = phase_task.result()
+            results = [
+                phase.results[index] if index in phase.results else late_response(persona_id=persona.get('id'))
+                for index, persona in enumerate(personas)
+            ]
+            persona_responses = self._collect_responses(personas, results)
+            if phase.late:
+                event = self._event(
+                    "personas_late", personas=[personas[index].get('name', 'Unknown') for index in phase.late]
+                )
+                self._publish(session_id, coordination_events, event)
+                yield event
+            timings["personas_finished"] = time.perf_counter()
+            
+            synthesis_input = None
+            if persona_responses:
+                synthesis_prompt, synthesis_input = await self._prepare_synthesis(user_query, persona_responses, use_cache, stats)
+                event = self._event(
+                    "synthesis_start",
+                    message="Generating synthesis from all perspectives...",
+                    prompt_tokens=synthesis_input["prompt_tokens"]
+                )
+                self._publish(session_id, coordination_events, event)
+                yield event
+                chunks = []
+                try:
+                    with tracer.span("synthesis", prompt_tokens=synthesis_input["prompt_tokens"]):
+                        async for token in self.grok.stream_complete(
+                            prompt=synthesis_prompt,
+                            system_prompt=self.SYNTHESIS_SYSTEM_PROMPT,
+                            use_cache=use_cache,
+                            stats=stats
+                        ):
+                            chunks.append(token)
+                            yield self._event("synthesis_token", token=token)
+                    synthesis = "".join(chunks)
+                except Exception as e:
+                    synthesis = f"Multiple perspectives were shared, but synthesis failed: {str(e)}"
+                    logger.warning("Synthesis error: %s", e)
+            else:
+                synthesis = "No valid responses were generated."
+            
+            timings["finished"] = time.perf_counter()
+            if persona_responses:
+                synthesis_seconds.observe(
+                    timings["finished"] - timings["personas_finished"], framework="google-adk-streaming"
+                )
+            self._publish(session_id, coordination_events, self._event("synthesis_completed", synthesis=synthesis))
+            result = self._build_result(
+                session_id, personas, persona_responses, synthesis, session_concurrency, timings, stats,
+                coordination_events, framework="google-adk-streaming", synthesis_input=synthesis_input,
+                quorum=phase.as_dict(lambda index: personas[index].get('name', 'Unknown'))
+            )
+            yield self._event("completed", result=result)
+        finally:
+            # Client went away mid-stream: stop the persona calls still running,
+            # and let them unwind before the root span ends
+            if not phase_task.done():
+                phase_task.cancel()
+            await asyncio.gather(phase_task, return_exceptions=True)
 
 # Global instance
 google_adk_system = GoogleADKMultiAgentSystem()
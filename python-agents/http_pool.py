@@ -0,0 +1,82 @@
+import os
+import logging
+from typing import Dict, Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# Connection tuning for upstream HTTP clients
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+HTTP_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", "20"))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30"))
+HTTP2_ENABLED = os.getenv("HTTP2_ENABLED", "false").lower() in ("1", "true", "yes")
+
+
+def _http2_available() -> bool:
+    """HTTP/2 needs the optional `h2` package (pip install httpx[http2])"""
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+class HTTPClientPool:
+    """App-lifetime pool of named httpx clients with keep-alive connections
+
+    Each upstream (e.g. "grok") gets one long-lived AsyncClient so TCP/TLS
+    connections are reused across completions instead of being opened per call.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections: int = HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry: float = HTTP_KEEPALIVE_EXPIRY,
+        http2: bool = HTTP2_ENABLED
+    ):
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry
+        )
+        self.http2 = http2
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+
+        if self.http2 and not _http2_available():
+            logger.warning("HTTP2_ENABLED is set but the 'h2' package is missing, using HTTP/1.1")
+            self.http2 = False
+
+    def get(self, name: str = "default") -> httpx.AsyncClient:
+        """Return the shared client for an upstream, opening it on first use"""
+        client = self._clients.get(name)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(limits=self.limits, http2=self.http2)
+            self._clients[name] = client
+        return client
+
+    async def start(self, names: Optional[list] = None):
+        """Open clients eagerly (called on app startup)"""
+        for name in names or []:
+            self.get(name)
+
+    async def close(self):
+        """Close every client and drop its connections (called on app shutdown)"""
+        clients = list(self._clients.values())
+        self._clients.clear()
+        for client in clients:
+            await client.aclose()
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "clients": sorted(self._clients.keys()),
+            "http2": self.http2,
+            "max_connections": self.limits.max_connections,
+            "max_keepalive_connections": self.limits.max_keepalive_connections,
+            "keepalive_expiry": self.limits.keepalive_expiry,
+        }
+
+
+# Global instance shared by the app and every agent
+http_pool = HTTPClientPool()
@@ -0,0 +1,178 @@
+import os
+import asyncio
+import itertools
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+# Job queue tuning
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+JOB_QUEUE_MAX = int(os.getenv("JOB_QUEUE_MAX", "100"))
+JOB_RETENTION_SECONDS = float(os.getenv("JOB_RETENTION_SECONDS", "3600"))
+
+# Lower value runs first
+JOB_PRIORITIES = {"high": 0, "normal": 1, "low": 2}
+
+
+class QueueFullError(Exception):
+    """Raised when a job is submitted while the queue is at capacity"""
+
+
+@dataclass
+class Job:
+    """An analysis request queued for background execution"""
+    id: str
+    payload: Any
+    priority: str = "normal"
+    status: str = "queued"  # queued | running | completed | failed | cancelled
+    progress: Dict[str, Any] = field(default_factory=dict)
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    task: Optional[asyncio.Task] = field(default=None, repr=False)
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("completed", "failed", "cancelled")
+
+    def as_dict(self) -> Dict[str, Any]:
+        def iso(ts: Optional[float]) -> Optional[str]:
+            return datetime.fromtimestamp(ts).isoformat() if ts else None
+
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "priority": self.priority,
+            "progress": self.progress,
+            "error": self.error,
+            "created_at": iso(self.created_at),
+            "started_at": iso(self.started_at),
+            "finished_at": iso(self.finished_at),
+        }
+
+
+class JobQueue:
+    """Bounded priority queue drained by a fixed pool of async workers
+
+    - Admission control: ``submit`` raises QueueFullError once ``max_queued``
+      jobs are waiting, so callers can answer 429 instead of piling up work.
+    - Priorities: "high" jobs are picked before "normal" and "low"; jobs of
+      equal priority run in submission order.
+    - Cancellation: queued jobs are skipped, running jobs are cancelled.
+    - Finished jobs are kept for ``retention`` seconds so results can be polled.
+    """
+
+    def __init__(
+        self,
+        runner: Callable[[Job], Awaitable[Dict[str, Any]]],
+        workers: int = JOB_WORKERS,
+        max_queued: int = JOB_QUEUE_MAX,
+        retention: float = JOB_RETENTION_SECONDS
+    ):
+        self.runner = runner
+        self.workers = workers
+        self.max_queued = max_queued
+        self.retention = retention
+        self.jobs: Dict[str, Job] = {}
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._sequence = itertools.count()
+        self._worker_tasks: List[asyncio.Task] = []
+        self._stopping = False
+        self.queued = 0
+        self.running = 0
+        self.rejected = 0
+
+    async def start(self):
+        self._stopping = False
+        self._queue = asyncio.PriorityQueue()
+        self._worker_tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self):
+        # Workers see their running job's cancellation too; this tells them to exit, not carry on
+        self._stopping = True
+        for job in self.jobs.values():
+            if job.task is not None and not job.task.done():
+                job.task.cancel()
+        for worker in self._worker_tasks:
+            worker.cancel()
+        await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        self._worker_tasks = []
+
+    def submit(self, payload: Any, priority: str = "normal") -> Job:
+        if priority not in JOB_PRIORITIES:
+            raise ValueError(f"Unknown priority: {priority}")
+        if self._queue is None:
+            raise RuntimeError("Job queue is not running")
+        if self.queued >= self.max_queued:
+            self.rejected += 1
+            raise QueueFullError(f"Job queue is full ({self.max_queued} jobs waiting)")
+
+        self._prune()
+        job = Job(id=uuid.uuid4().hex, payload=payload, priority=priority)
+        self.jobs[job.id] = job
+        self.queued += 1
+        self._queue.put_nowait((JOB_PRIORITIES[priority], next(self._sequence), job))
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self.jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> bool:
+        """Cancel a queued or running job; returns False if it already finished"""
+        job = self.jobs.get(job_id)
+        if job is None or job.finished:
+            return False
+        if job.status == "queued":
+            self.queued -= 1
+            self._finish(job, "cancelled")
+        elif job.task is not None:
+            job.task.cancel()
+        return True
+
+    def _finish(self, job: Job, status: str, error: Optional[str] = None):
+        job.status = status
+        job.error = error
+        job.finished_at = time.time()
+
+    def _prune(self):
+        cutoff = time.time() - self.retention
+        expired = [job_id for job_id, job in self.jobs.items() if job.finished and job.finished_at < cutoff]
+        for job_id in expired:
+            del self.jobs[job_id]
+
+    async def _worker(self):
+        while True:
+            _, _, job = await self._queue.get()
+            if job.status != "queued":
+                continue  # Cancelled while waiting
+
+            self.queued -= 1
+            self.running += 1
+            job.status = "running"
+            job.started_at = time.time()
+            try:
+                job.task = asyncio.create_task(self.runner(job))
+                job.result = await job.task
+                self._finish(job, "completed")
+            except asyncio.CancelledError:
+                self._finish(job, "cancelled")
+                if self._stopping or not job.task.cancelled():
+                    raise  # The worker itself is shutting down
+            except Exception as e:
+                self._finish(job, "failed", str(e))
+            finally:
+                self.running -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "queued": self.queued,
+            "running": self.running,
+            "max_queued": self.max_queued,
+            "rejected": self.rejected,
+            "tracked_jobs": len(self.jobs),
+        }
@@ -1,50 +1,149 @@
 import os
-from typing import Dict, List, Any, Optional
+import asyncio
+import hashlib
+import logging
+import operator
+from collections import OrderedDict
+from typing import Annotated, Dict, List, Any, Optional, Tuple, Type
 from langgraph.graph import StateGraph, END
-from langgraph.prebuilt import ToolExecutor
-from langchain_core.messages import BaseMessage, HumanMessage, AIMessage
+from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage
 from langchain_openai import ChatOpenAI
+import openai
 from pydantic import BaseModel
-import asyncio
 import json
+import time
 import httpx
 from datetime import datetime
 
+from event_bus import session_events
+from http_pool import http_pool
+from rate_limiter import DEFAULT_COMPLETION_TOKENS, estimate_tokens, grok_rate_limiter
+from request_context import current_session_id
+from resilience import UPSTREAM_MAX_RETRIES, UPSTREAM_MAX_RETRY_WAIT, backoff_delay, parse_retry_after
+from metrics import persona_completion_seconds, synthesis_seconds, upstream_retries, upstream_tokens
+from persona_prompts import persona_prompts, user_turn
+from persona_router import persona_router
+from quorum import gather_quorum, late_response, quorum_settings
+from synthesis_input import build_synthesis_input
+from tiered_synthesis import needs_tiering, reduce_responses
+from tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+# Persona agents kept for reuse across runs, keyed by persona ID and version
+LANGGRAPH_AGENT_POOL_SIZE = int(os.getenv("LANGGRAPH_AGENT_POOL_SIZE", "256"))
+
+def merge_results(current: Dict[str, Any], update: Dict[str, Any]) -> Dict[str, Any]:
+    """Reducer for ``results``: later keys win"""
+    return {**current, **update}
+
+def cached_prompt_tokens(response: BaseMessage) -> int:
+    """Prompt tokens the upstream served from its prefix cache, as reported in usage metadata"""
+    usage = getattr(response, "usage_metadata", None) or {}
+    return (usage.get("input_token_details") or {}).get("cache_read") or 0
+
 class AgentState(BaseModel):
-    """State shared between all agents in the multi-agent system"""
-    messages: List[BaseMessage] = []
+    """State shared between all agents in the multi-agent system
+    
+    ``messages``, ``coordination_events`` and ``results`` are reducer
+    channels: nodes return only what they add and LangGraph merges it.
+    """
+    messages: Annotated[List[BaseMessage], operator.add] = []
     personas: List[Dict[str, Any]] = []
     current_analysis: Optional[Dict[str, Any]] = None
-    coordination_events: List[Dict[str, Any]] = []
+    coordination_events: Annotated[List[Dict[str, Any]], operator.add] = []
     session_id: str
     user_query: str
     active_agents: List[str] = []
-    results: Dict[str, Any] = {}
+    results: Annotated[Dict[str, Any], merge_results] = {}
+    quorum: Optional[float] = None  # Fraction of personas to wait for before synthesis
+    persona_deadline: Optional[float] = None  # Seconds before synthesis starts regardless
+    use_llm_analyst: bool = False  # Pick personas with an LLM call instead of the local router
+
+class LLMClientRegistry:
+    """One ChatOpenAI client per model, shared by every agent
+    
+    Clients ride on the pooled "grok" keep-alive connections; if the pool
+    replaces that connection pool (e.g. after a restart), the client is rebuilt.
+    """
+    
+    def __init__(self):
+        self._clients: Dict[str, Tuple[httpx.AsyncClient, ChatOpenAI]] = {}
+        self.created = 0
+    
+    def get(self, model: str = "grok-3") -> ChatOpenAI:
+        http_client = http_pool.get("grok")
+        entry = self._clients.get(model)
+        if entry is None or entry[0] is not http_client:
+            llm = ChatOpenAI(
+                model=model,
+                api_key=os.getenv("OPENAI_API_KEY"),
+                base_url=os.getenv("GROK_API_BASE_URL", "https://api.x.ai/v1"),
+                http_async_client=http_client,
+                max_retries=0  # invoke_llm retries, so 429s reach the shared rate limiter
+            )
+            entry = self._clients[model] = (http_client, llm)
+            self.created += 1
+        return entry[1]
+    
+    def stats(self) -> Dict[str, Any]:
+        return {"models": sorted(self._clients), "created": self.created}
+
+# Global registry shared by all LangGraph agents
+llm_clients = LLMClientRegistry()
 
 class PersonaDocAgent:
     """Base class for all PersonaDoc agents"""
     
+    model = "grok-3"  # Using Grok-3 as per your system
+    
     def __init__(self, name: str, role: str, persona_id: Optional[str] = None):
         self.name = name
         self.role = role
         self.persona_id = persona_id
-        self.llm = ChatOpenAI(
-            model="grok-3",  # Using Grok-3 as per your system
-            api_key=os.getenv("OPENAI_API_KEY"),
-            base_url="https://api.x.ai/v1"
-        )
-        
-    async def get_persona_context(self, persona_id: str) -> Dict[str, Any]:
-        """Fetch persona data from TypeScript API"""
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"http://localhost:3000/api/personas/{persona_id}",
-                headers={"Authorization": f"Bearer {os.getenv('API_TOKEN')}"}
+    
+    @property
+    def llm(self) -> ChatOpenAI:
+        return llm_clients.get(self.model)
+        
+    async def invoke_llm(self, messages: List[BaseMessage]) -> BaseMessage:
+        """Call the LLM under the same rate limits as the GrokAPI path"""
+        estimated_tokens = sum(estimate_tokens(str(m.content)) for m in messages) + DEFAULT_COMPLETION_TOKENS
+        attempt = 0
+        while True:
+            await grok_rate_limiter.acquire(estimated_tokens)
+            retry_after = None
+            try:
+                with tracer.span("grok.chat_completions", agent=self.name, attempt=attempt + 1):
+                    response = await self.llm.ainvoke(messages)
+                break
+            except openai.RateLimitError as e:
+                retry_after = parse_retry_after(e.response.headers.get("retry-after"))
+                # Back the whole process off, not just this call
+                grok_rate_limiter.pause(retry_after or backoff_delay(attempt))
+                error: Exception = e
+            except (openai.APIConnectionError, openai.InternalServerError) as e:
+                error = e
+            
+            if attempt >= UPSTREAM_MAX_RETRIES or (retry_after or 0) > UPSTREAM_MAX_RETRY_WAIT:
+                raise error
+            delay = backoff_delay(attempt, retry_after)
+            logger.info(
+                "Grok attempt %d failed (%s), retrying in %.2fs", attempt + 1, error, delay,
+                extra={"retry_delay_s": round(delay, 3)}
             )
-            return response.json() if response.status_code == 200 else {}
+            upstream_retries.inc(upstream="grok")
+            attempt += 1
+            await asyncio.sleep(delay)
+        usage = getattr(response, "usage_metadata", None) or {}
+        grok_rate_limiter.settle(estimated_tokens, usage.get("total_tokens"))
+        upstream_tokens.inc(usage.get("input_tokens", 0), upstream="grok", direction="prompt")
+        upstream_tokens.inc(cached_prompt_tokens(response), upstream="grok", direction="cached_prompt")
+        upstream_tokens.inc(usage.get("output_tokens", 0), upstream="grok", direction="completion")
+        return response
     
     async def execute(self, state: AgentState) -> Dict[str, Any]:
-        """Execute agent logic - to be implemented by subclasses"""
+        """Execute agent logic and return the state delta - to be implemented by subclasses"""
         raise NotImplementedError
 
 class AnalystAgent(PersonaDocAgent):
@@ -67,16 +166,19 @@ class AnalystAgent(PersonaDocAgent):
         3. coordination_strategy: how agents should work together
         """
         
-        response = await self.llm.ainvoke([HumanMessage(content=analysis_prompt)])
+        response = await self.invoke_llm([HumanMessage(content=analysis_prompt)])
         
         try:
             analysis = json.loads(response.content)
-        except:
-            # Fallback if JSON parsing fails
+        except ValueError:
+            # Unparseable answer: rank personas locally instead
+            logger.warning("Analyst returned invalid JSON, using the local persona router")
+            routing = persona_router.route(state.user_query, state.personas)
             analysis = {
-                "relevant_personas": [p.get('name', 'Unknown') for p in state.personas[:3]],
+                "relevant_personas": [p.get('name', 'Unknown') for p in routing.personas],
                 "analysis_type": "general_analysis",
-                "coordination_strategy": "parallel_then_synthesize"
+                "coordination_strategy": "parallel_then_synthesize",
+                "relevance_scores": routing.scores
             }
         
         # Add coordination event
@@ -88,9 +190,9 @@ class AnalystAgent(PersonaDocAgent):
         }
         
         return {
-            "messages": state.messages + [response],
+            "messages": [response],
             "current_analysis": analysis,
-            "coordination_events": state.coordination_events + [coordination_event],
+            "coordination_events": [coordination_event],
             "active_agents": analysis.get("relevant_personas", [])
         }
 
@@ -106,41 +208,43 @@ class PersonaAgent(PersonaDocAgent):
         self.persona_data = persona_data
     
     async def execute(self, state: AgentState) -> Dict[str, Any]:
-        # Generate response from this persona's perspective
-        persona_context = f"""
-        You are {self.persona_data.get('name', 'Unknown')}.
-        Background: {self.persona_data.get('background', '')}
-        Perspective: {self.persona_data.get('perspective', '')}
-        Values: {self.persona_data.get('values', '')}
-        
-        Respond to this query from your unique perspective:
-        {state.user_query}
-        
-        Consider the current analysis context: {state.current_analysis}
-        """
-        
-        response = await self.llm.ainvoke([HumanMessage(content=persona_context)])
+        # Stable persona prefix first, per-request query and analysis context last
+        context = json.dumps(state.current_analysis) if state.current_analysis else None
+        messages = [
+            SystemMessage(content=persona_prompts.system_prefix(self.persona_data, style="full")),
+            HumanMessage(content=user_turn(state.user_query, context)),
+        ]
+        
+        started = time.perf_counter()
+        outcome = "error"  # Also covers calls cancelled by the quorum or deadline
+        try:
+            response = await self.invoke_llm(messages)
+            outcome = "ok"
+        finally:
+            persona_completion_seconds.observe(time.perf_counter() - started, framework="langgraph", outcome=outcome)
         
         # Add coordination event
         coordination_event = {
             "timestamp": datetime.now().isoformat(),
             "agent": self.name,
             "action": "persona_response",
-            "details": {"response_length": len(response.content)}
+            "details": {
+                "response_length": len(response.content),
+                "cached_prompt_tokens": cached_prompt_tokens(response)
+            }
         }
         
-        # Store result for this persona
-        results = state.results.copy()
-        results[self.name] = {
+        # Result for this persona only; the node merges them
+        result = {
             "response": response.content,
             "timestamp": datetime.now().isoformat(),
             "persona_id": self.persona_id
         }
         
         return {
-            "messages": state.messages + [response],
-            "coordination_events": state.coordination_events + [coordination_event],
-            "results": results
+            "messages": [response],
+            "coordination_events": [coordination_event],
+            "results": {self.name: result}
         }
 
 class SynthesizerAgent(PersonaDocAgent):
@@ -149,15 +253,24 @@ class SynthesizerAgent(PersonaDocAgent):
     def __init__(self):
         super().__init__("synthesizer", "Response Synthesis")
     
+    async def _complete(self, prompt: str, system_prompt: str) -> str:
+        response = await self.invoke_llm([SystemMessage(content=system_prompt), HumanMessage(content=prompt)])
+        return response.content
+    
     async def execute(self, state: AgentState) -> Dict[str, Any]:
-        # Synthesize all persona responses
+        # Synthesize all persona responses, condensing large sets in parallel groups first
+        started = time.perf_counter()
+        responses, tiering = state.results, None
+        if needs_tiering(responses):
+            responses, tiering = await reduce_responses(state.user_query, responses, self._complete)
+        synthesis_input = build_synthesis_input(responses)
         synthesis_prompt = f"""
         Synthesize the following persona responses into a coherent multi-perspective analysis:
         
         Original Query: {state.user_query}
         
         Persona Responses:
-        {json.dumps(state.results, indent=2)}
+        {synthesis_input.text}
         
         Create a synthesis that:
         1. Highlights key agreements and disagreements
@@ -166,26 +279,83 @@ class SynthesizerAgent(PersonaDocAgent):
         4. Maintains the unique voice of each persona
         """
         
-        response = await self.llm.ainvoke([HumanMessage(content=synthesis_prompt)])
+        response = await self.invoke_llm([HumanMessage(content=synthesis_prompt)])
+        synthesis_seconds.observe(time.perf_counter() - started, framework="langgraph")
         
         # Add coordination event
         coordination_event = {
             "timestamp": datetime.now().isoformat(),
             "agent": self.name,
             "action": "synthesis_complete",
-            "details": {"synthesized_responses": len(state.results)}
+            "details": {
+                "synthesized_responses": len(state.results),
+                "prompt_tokens": estimate_tokens(synthesis_prompt),
+                **synthesis_input.as_dict(),
+                "tiered": tiering
+            }
         }
         
         return {
-            "messages": state.messages + [response],
-            "coordination_events": state.coordination_events + [coordination_event],
-            "results": {**state.results, "synthesis": response.content}
+            "messages": [response],
+            "coordination_events": [coordination_event],
+            "results": {"synthesis": response.content}
+        }
+
+class AgentPool:
+    """Reusable agents: one per role, and one per persona version
+    
+    Agents hold no per-run state, so concurrent runs can share them. Persona
+    agents are keyed by ID and ``updatedAt`` (or a content hash when the
+    document has no timestamp), so an edited persona gets a fresh agent.
+    """
+    
+    def __init__(self, max_personas: int = LANGGRAPH_AGENT_POOL_SIZE):
+        self.max_personas = max_personas
+        self._roles: Dict[Type[PersonaDocAgent], PersonaDocAgent] = {}
+        self._personas: "OrderedDict[Tuple[Any, str], PersonaAgent]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+    
+    def role(self, agent_class: Type[PersonaDocAgent]) -> PersonaDocAgent:
+        agent = self._roles.get(agent_class)
+        if agent is None:
+            agent = self._roles[agent_class] = agent_class()
+        return agent
+    
+    @staticmethod
+    def _persona_key(persona_data: Dict[str, Any]) -> Tuple[Any, str]:
+        version = persona_data.get('updatedAt')
+        if not version:
+            version = hashlib.sha1(json.dumps(persona_data, sort_keys=True, default=str).encode()).hexdigest()
+        return persona_data.get('id'), str(version)
+    
+    def persona(self, persona_data: Dict[str, Any]) -> 'PersonaAgent':
+        key = self._persona_key(persona_data)
+        agent = self._personas.get(key)
+        if agent is not None:
+            self._personas.move_to_end(key)
+            self.hits += 1
+            return agent
+        self.misses += 1
+        agent = self._personas[key] = PersonaAgent(persona_data)
+        while len(self._personas) > self.max_personas:
+            self._personas.popitem(last=False)
+        return agent
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "roles": sorted(agent_class.__name__ for agent_class in self._roles),
+            "personas": len(self._personas),
+            "max_personas": self.max_personas,
+            "hits": self.hits,
+            "misses": self.misses,
         }
 
 class PersonaDocMultiAgentSystem:
     """LangGraph-based multi-agent system for PersonaDoc"""
     
     def __init__(self):
+        self.agents = AgentPool()
         self.graph = self._build_graph()
     
     def _build_graph(self) -> StateGraph:
@@ -205,61 +375,144 @@ class PersonaDocMultiAgentSystem:
         
         return workflow.compile()
     
-    async def _analyst_node(self, state: AgentState) -> AgentState:
-        """Execute analyst agent"""
-        analyst = AnalystAgent()
-        updates = await analyst.execute(state)
-        
-        # Update state
-        for key, value in updates.items():
-            setattr(state, key, value)
-        
-        return state
+    async def _analyst_node(self, state: AgentState) -> Dict[str, Any]:
+        """Pick the responding personas: local router by default, LLM analyst on request"""
+        if state.use_llm_analyst:
+            analyst = self.agents.role(AnalystAgent)
+            with tracer.span("analyst"):
+                updates = await analyst.execute(state)
+        else:
+            with tracer.span("router", personas=len(state.personas)):
+                updates = self._route_personas(state)
+        
+        session_events.publish(state.session_id, updates["coordination_events"][-1])
+        return updates
+    
+    @staticmethod
+    def _route_personas(state: AgentState) -> Dict[str, Any]:
+        """Rank personas against the query in-process, with no upstream call"""
+        routing = persona_router.route(state.user_query, state.personas)
+        analysis = {
+            "relevant_personas": [p.get('name', 'Unknown') for p in routing.personas],
+            "analysis_type": "local_relevance",
+            "coordination_strategy": "parallel_then_synthesize",
+            "relevance_scores": routing.scores
+        }
+        coordination_event = {
+            "timestamp": datetime.now().isoformat(),
+            "agent": "router",
+            "action": "query_analysis",
+            "details": {**analysis, "router_ms": routing.elapsed_ms}
+        }
+        return {
+            "current_analysis": analysis,
+            "coordination_events": [coordination_event],
+            "active_agents": analysis["relevant_personas"]
+        }
     
-    async def _personas_node(self, state: AgentState) -> AgentState:
+    async def _personas_node(self, state: AgentState) -> Dict[str, Any]:
         """Execute all relevant persona agents in parallel"""
         relevant_personas = state.current_analysis.get("relevant_personas", [])
         
-        # Create persona agents
-        persona_agents = []
+        # Reuse pooled persona agents, in the order the router ranked them
+        setup_started = time.perf_counter()
+        personas_by_name: Dict[str, List[Dict[str, Any]]] = {}
         for persona in state.personas:
-            if persona.get('name') in relevant_personas:
-                persona_agents.append(PersonaAgent(persona))
-        
-        # Execute all persona agents in parallel
-        tasks = [agent.execute(state) for agent in persona_agents]
-        results = await asyncio.gather(*tasks)
-        
-        # Merge all updates
-        for updates in results:
-            for key, value in updates.items():
-                if key == "messages":
-                    state.messages.extend(value[len(state.messages):])
-                elif key == "coordination_events":
-                    state.coordination_events.extend(value[len(state.coordination_events):])
-                elif key == "results":
-                    state.results.update(value)
-        
-        return state
+            personas_by_name.setdefault(persona.get('name'), []).append(persona)
+        persona_agents = [
+            self.agents.persona(persona)
+            for name in dict.fromkeys(relevant_personas)
+            for persona in personas_by_name.get(name, [])
+        ]
+        setup_ms = round((time.perf_counter() - setup_started) * 1000, 2)
+        
+        # Execute all persona agents in parallel, publishing each result as it lands,
+        # until the quorum or deadline is reached
+        def publish(index: int, updates: Any):
+            if not isinstance(updates, BaseException):
+                agent = persona_agents[index]
+                session_events.publish(state.session_id, {
+                    **updates["coordination_events"][-1],
+                    "result": updates["results"][agent.name]
+                })
+        
+        with tracer.span("persona_phase", personas=len(persona_agents), agent_setup_ms=setup_ms):
+            phase = await gather_quorum(
+                {index: self._run_persona(agent, state) for index, agent in enumerate(persona_agents)},
+                **quorum_settings(state.quorum, state.persona_deadline),
+                on_result=publish
+            )
+        
+        # Collect the persona deltas; LangGraph appends them to the state channels
+        messages: List[BaseMessage] = []
+        coordination_events: List[Dict[str, Any]] = []
+        results: Dict[str, Any] = {}
+        for index, agent in enumerate(persona_agents):
+            updates = phase.results.get(index)
+            if updates is None:
+                results[agent.name] = late_response(persona_id=agent.persona_id)
+            elif isinstance(updates, BaseException):
+                results[agent.name] = {
+                    "response": f"Error: Unable to generate response ({updates})",
+                    "persona_id": agent.persona_id,
+                    "timestamp": datetime.now().isoformat(),
+                    "error": True
+                }
+            else:
+                messages.extend(updates["messages"])
+                coordination_events.extend(updates["coordination_events"])
+                results.update(updates["results"])
+        
+        if phase.late:
+            late_event = {
+                "timestamp": datetime.now().isoformat(),
+                "agent": "personas",
+                "action": "personas_late",
+                "details": phase.as_dict(lambda index: persona_agents[index].name)
+            }
+            coordination_events.append(late_event)
+            session_events.publish(state.session_id, late_event)
+        
+        return {"messages": messages, "coordination_events": coordination_events, "results": results}
+    
+    @staticmethod
+    async def _run_persona(agent: PersonaAgent, state: AgentState) -> Dict[str, Any]:
+        with tracer.span("persona", persona=agent.name):
+            return await agent.execute(state)
     
-    async def _synthesizer_node(self, state: AgentState) -> AgentState:
+    async def _synthesizer_node(self, state: AgentState) -> Dict[str, Any]:
         """Execute synthesizer agent"""
-        synthesizer = SynthesizerAgent()
-        updates = await synthesizer.execute(state)
-        
-        # Update state
-        for key, value in updates.items():
-            if key == "messages":
-                state.messages.extend(value[len(state.messages):])
-            elif key == "coordination_events":
-                state.coordination_events.extend(value[len(state.coordination_events):])
-            else:
-                setattr(state, key, value)
+        synthesizer = self.agents.role(SynthesizerAgent)
+        with tracer.span("synthesis"):
+            updates = await synthesizer.execute(state)
         
-        return state
+        session_events.publish(state.session_id, updates["coordination_events"][-1])
+        return updates
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "agent_pool": self.agents.stats(),
+            "llm_clients": llm_clients.stats(),
+            "persona_router": persona_router.stats()
+        }
     
-    async def run_analysis(self, session_id: str, user_query: str, personas: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """Run the complete multi-agent analysis"""
+    async def run_analysis(
+        self,
+        session_id: str,
+        user_query: str,
+        personas: List[Dict[str, Any]],
+        quorum: Optional[float] = None,
+        deadline: Optional[float] = None,
+        use_llm_analyst: bool = False
+    ) -> Dict[str, Any]:
+        """Run the complete multi-agent analysis
+        
+        ``quorum`` and ``deadline`` let synthesis start before slow personas
+        finish; those are cancelled and reported as late. Personas are picked
+        by the local relevance router unless ``use_llm_analyst`` is set.
+        """
+        
+        current_session_id.set(session_id)  # Rate limiter queues this session's calls together
         
         # Initialize state
         initial_state = AgentState(
@@ -268,18 +521,29 @@ class PersonaDocMultiAgentSystem:
             personas=personas,
             messages=[],
             coordination_events=[],
-            results={}
+            results={},
+            quorum=quorum,
+            persona_deadline=deadline,
+            use_llm_analyst=use_llm_analyst
         )
         
-        # Run the graph
+        # Run the graph; compiled graphs return the channel values as a dict
         final_state = await self.graph.ainvoke(initial_state)
+        if isinstance(final_state, BaseModel):
+            final_state = final_state.model_dump()
+        results = final_state.get("results", {})
+        coordination_events = list(final_state.get("coordination_events", []))
+        
+        trace_summary = tracer.summary()
+        if trace_summary is not None:
+            coordination_events.append(trace_summary)
         
         return {
             "session_id": session_id,
-            "synthesis": final_state.results.get("synthesis", ""),
-            "persona_responses": {k: v for k, v in final_state.results.items() if k != "synthesis"},
-            "coordination_events": final_state.coordination_events,
-            "analysis": final_state.current_analysis
+            "synthesis": results.get("synthesis", ""),
+            "persona_responses": {k: v for k, v in results.items() if k != "synthesis"},
+            "coordination_events": coordination_events,
+            "analysis": final_state.get("current_analysis")
         }
 
 # Global instance
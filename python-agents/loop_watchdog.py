@@ -0,0 +1,143 @@
+import os
+import asyncio
+import logging
+import math
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+
+from metrics import event_loop_lag_seconds, event_loop_stalls
+
+logger = logging.getLogger(__name__)
+
+# Event-loop watchdog tuning
+LOOP_LAG_INTERVAL = float(os.getenv("LOOP_LAG_INTERVAL", "0.1"))
+# A heartbeat late by more than this counts as a stall and is logged with a stack
+LOOP_STALL_THRESHOLD = float(os.getenv("LOOP_STALL_THRESHOLD", "0.1"))
+LOOP_LAG_WINDOW = int(os.getenv("LOOP_LAG_WINDOW", "3000"))  # Lag samples kept for percentiles
+LOOP_RECENT_STALLS = 20
+STACK_FRAMES = 15
+
+
+def _percentile(ordered: List[float], q: float) -> Optional[float]:
+    if not ordered:
+        return None
+    index = min(len(ordered) - 1, max(0, math.ceil(q / 100 * len(ordered)) - 1))
+    return round(ordered[index] * 1000, 2)
+
+
+class LoopWatchdog:
+    """Measures event-loop lag and reports callbacks that block the loop
+
+    A heartbeat task sleeps for ``interval`` and records how late it wakes
+    up; that delay is time some other callback held the loop. A monitor
+    thread watches the heartbeat and, once the loop has been silent for
+    longer than ``threshold``, captures the loop thread's current stack,
+    i.e. the code that is blocking it, while it is still running.
+    """
+
+    def __init__(
+        self,
+        interval: float = LOOP_LAG_INTERVAL,
+        threshold: float = LOOP_STALL_THRESHOLD,
+        window: int = LOOP_LAG_WINDOW
+    ):
+        self.interval = interval
+        self.threshold = threshold
+        self._lags: Deque[float] = deque(maxlen=window)
+        self._recent: Deque[Dict[str, Any]] = deque(maxlen=LOOP_RECENT_STALLS)
+        self._last_beat = time.monotonic()
+        self._loop_thread_id: Optional[int] = None
+        self._stall_stack: Optional[List[str]] = None
+        self._heartbeat: Optional[asyncio.Task] = None
+        self._monitor: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+        self.stalls = 0
+
+    def start(self):
+        """Start watching the running loop; call from a startup hook"""
+        if self._heartbeat is not None:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._stopped.clear()
+        self._heartbeat = asyncio.create_task(self._beat())
+        self._monitor = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._monitor.start()
+
+    async def stop(self):
+        self._stopped.set()
+        if self._heartbeat is not None:
+            self._heartbeat.cancel()
+            try:
+                await self._heartbeat
+            except asyncio.CancelledError:
+                pass
+            self._heartbeat = None
+        if self._monitor is not None:
+            self._monitor.join(timeout=1)
+            self._monitor = None
+
+    async def _beat(self):
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            self._last_beat = now
+            lag = max(0.0, now - expected)
+            self._lags.append(lag)
+            event_loop_lag_seconds.observe(lag)
+            if lag >= self.threshold:
+                self._record_stall(lag)
+
+    def _record_stall(self, lag: float):
+        stack, self._stall_stack = self._stall_stack, None
+        self.stalls += 1
+        event_loop_stalls.inc()
+        self._recent.append({
+            "at": time.time(),
+            "lag_ms": round(lag * 1000, 1),
+            "stack": stack[-3:] if stack else None,
+        })
+
+    def _watch(self):
+        """Monitor thread: grab the loop thread's stack while a stall is in progress"""
+        poll = max(self.threshold / 4, 0.005)
+        while not self._stopped.wait(poll):
+            blocked = time.monotonic() - self._last_beat - self.interval
+            if blocked < self.threshold or self._stall_stack is not None:
+                continue
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            stack = [line.rstrip() for line in traceback.format_stack(frame)[-STACK_FRAMES:]]
+            self._stall_stack = stack
+            logger.warning(
+                "Event loop blocked for at least %.0f ms",
+                blocked * 1000,
+                extra={"stack": "\n".join(stack)}
+            )
+
+    def stats(self) -> Dict[str, Any]:
+        ordered = sorted(self._lags)
+        return {
+            "running": self._heartbeat is not None,
+            "interval_ms": self.interval * 1000,
+            "stall_threshold_ms": self.threshold * 1000,
+            "samples": len(ordered),
+            "lag_ms": {
+                "p50": _percentile(ordered, 50),
+                "p95": _percentile(ordered, 95),
+                "p99": _percentile(ordered, 99),
+                "max": round(ordered[-1] * 1000, 2) if ordered else None,
+            },
+            "stalls": self.stalls,
+            "recent_stalls": list(self._recent),
+        }
+
+
+# Global instance started by the FastAPI app
+loop_watchdog = LoopWatchdog()
@@ -1,31 +1,68 @@
-from fastapi import FastAPI, HTTPException, BackgroundTasks
+import time
+_import_started = time.perf_counter()
+
+from fastapi import FastAPI, HTTPException, BackgroundTasks, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
 from typing import List, Dict, Any, Optional
 import asyncio
-import httpx
 import os
+from contextlib import asynccontextmanager
 from dotenv import load_dotenv
 import json
+import logging
 from datetime import datetime
 
-# Import agent systems
-try:
-    from langgraph_system import multi_agent_system as langgraph_system
-except ImportError:
-    langgraph_system = None
-    print("⚠️ LangGraph system not available")
+# Load .env before local modules read their settings from the environment
+load_dotenv()
 
-try:
-    from google_adk_system import google_adk_system
-except ImportError:
-    google_adk_system = None
-    print("⚠️ Google ADK system not available")
+from logging_config import configure_logging
+configure_logging()
+logger = logging.getLogger(__name__)
 
-load_dotenv()
+from http_pool import http_pool
+from persona_loader import persona_loader
+from persona_digest import persona_digests
+from persona_prompts import persona_prompts
+from completion_cache import completion_cache
+from session_store import session_store
+from event_bus import session_events
+from job_queue import Job, JobQueue, QueueFullError
+from resilience import CIRCUIT_STATE_VALUES, circuit_breakers
+from rate_limiter import grok_rate_limiter
+import metrics
+from tracing import tracer
+from loop_watchdog import loop_watchdog
 
-app = FastAPI(title="PersonaDoc Multi-Agent Service")
+# Agent systems are imported on first use (see framework_backends)
+from framework_backends import framework_backends
+
+# Frameworks to import in the background right after startup, e.g. "google-adk"
+PRELOAD_FRAMEWORKS = [name for name in os.getenv("PRELOAD_FRAMEWORKS", "").split(",") if name]
+
+MAIN_IMPORT_MS = round((time.perf_counter() - _import_started) * 1000, 1)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start shared resources before serving and stop them in reverse order on shutdown"""
+    # Shared keep-alive clients used for upstream calls
+    await http_pool.start(["grok", "typescript"])
+    # Measure event-loop lag and log callbacks that block it
+    loop_watchdog.start()
+    # Import configured frameworks off the event loop so the first request skips the cost
+    for name in PRELOAD_FRAMEWORKS:
+        asyncio.create_task(asyncio.to_thread(framework_backends.get, name))
+    await job_queue.start()
+    try:
+        yield
+    finally:
+        # Running jobs still use the HTTP pool, so stop them first
+        await job_queue.stop()
+        await loop_watchdog.stop()
+        await http_pool.close()
+
+app = FastAPI(title="PersonaDoc Multi-Agent Service", lifespan=lifespan)
 
 # Enable CORS for Vercel integration
 app.add_middleware(
@@ -36,36 +73,6 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-class MultiAgentRequest(BaseModel):
-    session_id: str
-    user_query: str
-    persona_ids: List[str]
-    framework: str = "google-adk"  # Default to Google ADK
-
-class MultiAgentResponse(BaseModel):
-    session_id: str
-    synthesis: str
-    persona_responses: Dict[str, Any]
-    coordination_events: List[Dict[str, Any]]
-    analysis: Dict[str, Any]
-
-# Store for session updates (in production, use Redis)
-session_updates = {}
-
-@app.get("/health")
-async def health_check():
-    available_frameworks = []
-    if google_adk_system:
-        available_frameworks.append("google-adk")
-    if langgraph_system:
-        available_frameworks.append("langgraph")
-    
-    return {
-        "status": "healthy", 
-        "service": "PersonaDoc Multi-Agent",
-        "available_frameworks": available_frameworks
-    }
-
 @app.get("/debug/environment")
 async def debug_environment():
     """Debug endpoint to check environment variables"""
@@ -85,18 +92,17 @@ async def debug_persona_fetch(persona_id: str):
     api_base_url = os.getenv('TYPESCRIPT_API_URL', 'http://localhost:3000')
     
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{api_base_url}/api/personas/{persona_id}",
-                headers={"Authorization": f"Bearer {os.getenv('API_TOKEN')}"},
-                timeout=10.0
-            )
-            return {
-                "url": f"{api_base_url}/api/personas/{persona_id}",
-                "status_code": response.status_code,
-                "headers": dict(response.headers),
-                "response": response.text if response.status_code != 200 else response.json()
-            }
+        response = await http_pool.get("typescript").get(
+            f"{api_base_url}/api/personas/{persona_id}",
+            headers={"Authorization": f"Bearer {os.getenv('API_TOKEN')}"},
+            timeout=10.0
+        )
+        return {
+            "url": f"{api_base_url}/api/personas/{persona_id}",
+            "status_code": response.status_code,
+            "headers": dict(response.headers),
+            "response": response.text if response.status_code != 200 else response.json()
+        }
     except Exception as e:
         return {
             "url": f"{api_base_url}/api/personas/{persona_id}",
@@ -106,6 +112,7 @@ async def debug_persona_fetch(persona_id: str):
 @app.get("/debug/last-analysis")
 async def debug_last_analysis():
     """Debug endpoint to show the last analysis details"""
+    google_adk_system = framework_backends.get("google-adk")
     if not google_adk_system:
         return {"error": "Google ADK system not available"}
     
@@ -134,25 +141,25 @@ async def debug_grok_test():
         return {"error": "GROK_API_KEY not set"}
     
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                "https://api.x.ai/v1/chat/completions",
-                headers={
-                    "Content-Type": "application/json",
-                    "Authorization": f"Bearer {grok_api_key}"
-                },
-                json={
-                    "messages": [{"role": "user", "content": "Test message from Railway"}],
-                    "model": "grok-3",
-                    "stream": False
-                },
-                timeout=30.0
-            )
-            return {
-                "status_code": response.status_code,
-                "response": response.json() if response.status_code == 200 else response.text,
-                "api_key_prefix": grok_api_key[:10] + "..." if grok_api_key else "None"
-            }
+        response = await http_pool.get("grok").post(
+            f"{os.getenv('GROK_API_BASE_URL', 'https://api.x.ai/v1')}/chat/completions",
+            headers={
+                "Content-Type": "application/json",
+                "Authorization": f"Bearer {grok_api_key}"
+            },
+            json={
+                "messages": [{"role": "user", "content": "Test message from Railway"}],
+                "model": "grok-3",
+                "stream": False
+            },
+            timeout=30.0
+        )
+        return {
+            "status_code": response.status_code,
+            "response": response.json() if response.status_code == 200 else response.text,
+            "api_key_prefix": grok_api_key[:10] + "..." if grok_api_key else "None",
+            "http_pool": http_pool.stats()
+        }
     except Exception as e:
         return {
             "error": str(e),
@@ -164,6 +171,11 @@ class MultiAgentRequest(BaseModel):
     user_query: str
     persona_ids: List[str]
     framework: str = "google-adk"  # Default to Google ADK
+    max_concurrency: Optional[int] = None  # Per-session cap on concurrent persona calls
+    bypass_cache: bool = False  # Skip completion cache reads for this request
+    quorum: Optional[float] = None  # Start synthesis once this fraction of personas answered
+    deadline_seconds: Optional[float] = None  # ...or this long into the persona phase
+    use_llm_analyst: bool = False  # LangGraph: pick personas with an LLM call instead of the local router
 
 class MultiAgentResponse(BaseModel):
     session_id: str
@@ -172,298 +184,459 @@ class MultiAgentResponse(BaseModel):
     coordination_events: List[Dict[str, Any]]
     analysis: Dict[str, Any]
 
-# Store for session updates (in production, use Redis)
-session_updates = {}
-
 @app.get("/health")
 async def health_check():
-    available_frameworks = []
-    if google_adk_system:
-        available_frameworks.append("google-adk")
-    if langgraph_system:
-        available_frameworks.append("langgraph")
-    
     return {
         "status": "healthy", 
         "service": "PersonaDoc Multi-Agent",
-        "available_frameworks": available_frameworks,
+        "available_frameworks": framework_backends.available(),
+        "loaded_frameworks": framework_backends.loaded(),
         "default_framework": "google-adk",
         "ai_model": "grok-3"
     }
 
+@app.get("/debug/startup")
+async def debug_startup():
+    """Debug endpoint reporting import cost of the service and each framework backend"""
+    return {
+        "main_import_ms": MAIN_IMPORT_MS,
+        "frameworks": framework_backends.report()
+    }
+
+@app.get("/debug/agent-pool")
+async def debug_agent_pool():
+    """Debug endpoint to inspect pooled LangGraph agents and shared LLM clients"""
+    if "langgraph" not in framework_backends.loaded():
+        return {"loaded": False}
+    return {"loaded": True, **framework_backends.get("langgraph").stats()}
+
+async def load_personas(persona_ids: List[str]) -> List[Dict[str, Any]]:
+    """Fetch persona documents concurrently through the shared persona cache"""
+    with tracer.span("load_personas", count=len(persona_ids)):
+        personas, errors = await persona_loader.load_many(persona_ids)
+    for error in errors:
+        logger.warning("%s", error, extra={"persona_id": error.persona_id, "status_code": error.status_code})
+    return personas
+
+@app.post("/personas/invalidate")
+async def invalidate_persona_cache():
+    """Drop every cached persona document"""
+    return {"invalidated": persona_loader.invalidate()}
+
+@app.post("/personas/{persona_id}/invalidate")
+async def invalidate_persona(persona_id: str):
+    """Drop a cached persona document after it changes in the TypeScript API"""
+    return {"persona_id": persona_id, "invalidated": persona_loader.invalidate(persona_id)}
+
+@app.get("/debug/persona-cache")
+async def debug_persona_cache():
+    """Debug endpoint to inspect the persona document, digest and prompt prefix caches"""
+    return {
+        **persona_loader.stats(),
+        "digests": persona_digests.stats(),
+        "prompt_prefixes": persona_prompts.stats()
+    }
+
+@app.get("/debug/completion-cache")
+async def debug_completion_cache():
+    """Debug endpoint to inspect the Grok completion cache"""
+    if completion_cache is None:
+        return {"backend": "none"}
+    return await completion_cache.stats()
+
+@app.get("/debug/session-store")
+async def debug_session_store():
+    """Debug endpoint to inspect session store size and limits"""
+    return await session_store.stats()
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    """Prometheus scrape endpoint"""
+    for name, breaker in circuit_breakers.items():
+        metrics.upstream_circuit_state.set(CIRCUIT_STATE_VALUES[breaker.state], upstream=name)
+    return PlainTextResponse(metrics.registry.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/debug/upstream")
+async def debug_upstream():
+    """Debug endpoint to inspect circuit breakers, retry counts and the Grok rate limiter"""
+    return {
+        "circuit_breakers": {name: breaker.stats() for name, breaker in circuit_breakers.items()},
+        "rate_limiter": grok_rate_limiter.stats()
+    }
+
+@app.get("/debug/event-loop")
+async def debug_event_loop():
+    """Debug endpoint to inspect event-loop lag percentiles and recent stalls"""
+    return loop_watchdog.stats()
+
+@app.get("/debug/session-events")
+async def debug_session_events():
+    """Debug endpoint to inspect live session subscriptions"""
+    return session_events.stats()
+
 @app.post("/google-adk/analyze", response_model=MultiAgentResponse)
 async def run_google_adk_analysis(request: MultiAgentRequest, background_tasks: BackgroundTasks):
     """Run multi-agent analysis using Google ADK coordination with Grok-3 intelligence"""
     
+    google_adk_system = framework_backends.get("google-adk")
     if not google_adk_system:
         raise HTTPException(status_code=503, detail="Google ADK system not available")
     
-    try:
-        # Fetch persona data from TypeScript API
-        personas = []
-        # Use environment variable for API base URL, fallback to localhost for development
-        api_base_url = os.getenv('TYPESCRIPT_API_URL', 'http://localhost:3000')
-        
-        async with httpx.AsyncClient() as client:
-            for persona_id in request.persona_ids:
-                try:
-                    response = await client.get(
-                        f"{api_base_url}/api/personas/{persona_id}",
-                        headers={"Authorization": f"Bearer {os.getenv('API_TOKEN')}"},
-                        timeout=10.0
-                    )
-                    if response.status_code == 200:
-                        personas.append(response.json())
-                    else:
-                        print(f"Failed to fetch persona {persona_id}: {response.status_code}")
-                except Exception as e:
-                    print(f"Error fetching persona {persona_id}: {e}")
-        
-        if not personas:
-            raise HTTPException(status_code=400, detail="No valid personas found")
-        
-        # Run Google ADK analysis with Grok-3
-        print(f"🔄 Starting Google ADK analysis with {len(personas)} personas")
-        result = await google_adk_system.run_analysis(
-            session_id=request.session_id,
-            user_query=request.user_query,
-            personas=personas
-        )
-        
-        print(f"📊 Google ADK result keys: {list(result.keys())}")
-        print(f"📊 Persona responses keys: {list(result.get('persona_responses', {}).keys())}")
-        print(f"📊 Synthesis length: {len(str(result.get('synthesis', '')))}")
-        print(f"📊 Coordination events count: {len(result.get('coordination_events', []))}")
-        
-        # Ensure synthesis is not None
-        if result.get("synthesis") is None:
-            result["synthesis"] = "Analysis completed but synthesis was not generated."
-        
-        # Store updates for streaming
-        session_updates[request.session_id] = result
-        
-        # Send updates back to TypeScript API in background
-        background_tasks.add_task(send_updates_to_typescript, request.session_id, result)
-        
-        return MultiAgentResponse(**result)
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Google ADK analysis failed: {str(e)}")
-
-@app.post("/google-adk/analyze-stream")
-async def stream_google_adk_analysis(request: MultiAgentRequest):
-    """Stream Google ADK coordination process in real-time"""
-    
-    if not google_adk_system:
-        raise HTTPException(status_code=503, detail="Google ADK system not available")
-    
-    async def generate_stream():
+    with metrics.track_analysis("google-adk/analyze"), tracer.span("POST /google-adk/analyze", session_id=request.session_id):
         try:
-            # Initial event
-            yield f"data: {json.dumps({'type': 'start', 'message': 'Starting Google ADK coordination...', 'timestamp': datetime.now().isoformat()})}\n\n"
-            
-            # Fetch personas
-            yield f"data: {json.dumps({'type': 'event', 'message': 'Fetching persona data...', 'timestamp': datetime.now().isoformat()})}\n\n"
-            
-            personas = []
-            api_base_url = os.getenv('TYPESCRIPT_API_URL', 'http://localhost:3000')
-            
-            async with httpx.AsyncClient() as client:
-                for persona_id in request.persona_ids:
-                    try:
-                        yield f"data: {json.dumps({'type': 'event', 'message': f'Loading persona {persona_id}...', 'timestamp': datetime.now().isoformat()})}\n\n"
-                        
-                        response = await client.get(
-                            f"{api_base_url}/api/personas/{persona_id}",
-                            headers={"Authorization": f"Bearer {os.getenv('API_TOKEN')}"},
-                            timeout=10.0
-                        )
-                        if response.status_code == 200:
-                            persona_data = response.json()
-                            personas.append(persona_data)
-                            yield f"data: {json.dumps({'type': 'persona_loaded', 'persona': {'name': persona_data.get('name', 'Unknown'), 'id': persona_id}, 'timestamp': datetime.now().isoformat()})}\n\n"
-                        else:
-                            yield f"data: {json.dumps({'type': 'error', 'message': f'Failed to load persona {persona_id}', 'timestamp': datetime.now().isoformat()})}\n\n"
-                    except Exception as e:
-                        yield f"data: {json.dumps({'type': 'error', 'message': f'Error loading persona {persona_id}: {str(e)}', 'timestamp': datetime.now().isoformat()})}\n\n"
+            # Fetch persona data from TypeScript API
+            personas = await load_personas(request.persona_ids)
             
             if not personas:
-                yield f"data: {json.dumps({'type': 'error', 'message': 'No valid personas found', 'timestamp': datetime.now().isoformat()})}\n\n"
-                return
-            
-            # Start coordination
-            yield f"data: {json.dumps({'type': 'coordination_start', 'message': f'Starting coordination with {len(personas)} personas...', 'timestamp': datetime.now().isoformat()})}\n\n"
+                raise HTTPException(status_code=400, detail="No valid personas found")
             
-            # Process each persona
-            persona_responses = {}
-            for i, persona in enumerate(personas):
-                persona_name = persona.get('name', f'Persona {i+1}')
-                yield f"data: {json.dumps({'type': 'persona_thinking', 'persona': {'name': persona_name, 'id': persona.get('id')}, 'message': f'{persona_name} is analyzing the query...', 'timestamp': datetime.now().isoformat()})}\n\n"
-                
-                # Simulate some thinking time
-                await asyncio.sleep(2)
-                
-                yield f"data: {json.dumps({'type': 'persona_responding', 'persona': {'name': persona_name, 'id': persona.get('id')}, 'message': f'{persona_name} is formulating response...', 'timestamp': datetime.now().isoformat()})}\n\n"
-                
-                # Get actual response (this would call the real Google ADK agent)
-                try:
-                    # For now, simulate the response - in real implementation, this would call the agent
-                    await asyncio.sleep(3)  # Simulate processing time
-                    
-                    # This would be replaced with actual agent execution
-                    response_content = f"Response from {persona_name} analyzing: {request.user_query}"
-                    
-                    persona_responses[persona_name] = {
-                        "response": response_content,
-                        "persona_id": persona.get('id'),
-                        "timestamp": datetime.now().isoformat()
-                    }
-                    
-                    yield f"data: {json.dumps({'type': 'persona_completed', 'persona': {'name': persona_name, 'id': persona.get('id')}, 'response': response_content, 'timestamp': datetime.now().isoformat()})}\n\n"
-                    
-                except Exception as e:
-                    yield f"data: {json.dumps({'type': 'persona_error', 'persona': {'name': persona_name, 'id': persona.get('id')}, 'error': str(e), 'timestamp': datetime.now().isoformat()})}\n\n"
+            # Run Google ADK analysis with Grok-3
+            result = await google_adk_system.run_analysis(
+                session_id=request.session_id,
+                user_query=request.user_query,
+                personas=personas,
+                max_concurrency=request.max_concurrency,
+                use_cache=not request.bypass_cache,
+                quorum=request.quorum,
+                deadline=request.deadline_seconds
+            )
             
-            # Synthesis phase
-            yield f"data: {json.dumps({'type': 'synthesis_start', 'message': 'Generating synthesis from all perspectives...', 'timestamp': datetime.now().isoformat()})}\n\n"
+            logger.debug(
+                "Google ADK analysis finished",
+                extra={
+                    "persona_responses": len(result.get("persona_responses", {})),
+                    "synthesis_chars": len(str(result.get("synthesis", ""))),
+                    "coordination_events": len(result.get("coordination_events", [])),
+                }
+            )
             
-            await asyncio.sleep(2)  # Simulate synthesis time
+            # Ensure synthesis is not None
+            if result.get("synthesis") is None:
+                result["synthesis"] = "Analysis completed but synthesis was not generated."
             
-            synthesis = f"Synthesis of perspectives from {len(personas)} personas regarding: {request.user_query}"
+            # Store updates for streaming
+            await store_session_result(request.session_id, result)
             
-            # Final result
-            result = {
-                "session_id": request.session_id,
-                "synthesis": synthesis,
-                "persona_responses": persona_responses,
-                "coordination_events": [],
-                "analysis": {
-                    "total_personas": len(personas),
-                    "successful_responses": len(persona_responses),
-                    "execution_framework": "google-adk-streaming",
-                    "model_used": "grok-3"
-                }
-            }
+            # Send updates back to TypeScript API in background
+            background_tasks.add_task(send_updates_to_typescript, request.session_id, result, tracer.inject({}))
             
-            yield f"data: {json.dumps({'type': 'completed', 'result': result, 'timestamp': datetime.now().isoformat()})}\n\n"
+            return MultiAgentResponse(**result)
             
         except Exception as e:
-            yield f"data: {json.dumps({'type': 'error', 'message': f'Stream error: {str(e)}', 'timestamp': datetime.now().isoformat()})}\n\n"
+            raise HTTPException(status_code=500, detail=f"Google ADK analysis failed: {str(e)}")
+
+def sse_event(payload: Dict[str, Any]) -> str:
+    """Format one server-sent event"""
+    return f"data: {json.dumps(payload)}\n\n"
+
+@app.post("/google-adk/analyze-stream")
+async def stream_google_adk_analysis(request: MultiAgentRequest):
+    """Stream Google ADK coordination in real-time
+    
+    Persona agents run concurrently and their Grok tokens are forwarded as
+    they arrive (``persona_token`` events tagged with the persona), followed
+    by the streamed synthesis (``synthesis_token``) and a ``completed`` event.
+    """
+    
+    google_adk_system = framework_backends.get("google-adk")
+    if not google_adk_system:
+        raise HTTPException(status_code=503, detail="Google ADK system not available")
     
-    return StreamingResponse(generate_stream(), media_type="text/plain")
+    async def generate_stream():
+        with metrics.track_analysis("google-adk/analyze-stream"), tracer.span("POST /google-adk/analyze-stream", session_id=request.session_id):
+            try:
+                # Initial event
+                yield sse_event({'type': 'start', 'message': 'Starting Google ADK coordination...', 'timestamp': datetime.now().isoformat()})
+                
+                # Fetch personas
+                yield sse_event({'type': 'event', 'message': 'Fetching persona data...', 'timestamp': datetime.now().isoformat()})
+                
+                with tracer.span("load_personas", count=len(request.persona_ids)):
+                    personas, errors = await persona_loader.load_many(request.persona_ids)
+                
+                for persona in personas:
+                    yield sse_event({'type': 'persona_loaded', 'persona': {'name': persona.get('name', 'Unknown'), 'id': persona.get('id')}, 'timestamp': datetime.now().isoformat()})
+                for error in errors:
+                    yield sse_event({'type': 'error', 'message': str(error), 'timestamp': datetime.now().isoformat()})
+                
+                if not personas:
+                    yield sse_event({'type': 'error', 'message': 'No valid personas found', 'timestamp': datetime.now().isoformat()})
+                    return
+                
+                # Start coordination
+                yield sse_event({'type': 'coordination_start', 'message': f'Starting coordination with {len(personas)} personas...', 'timestamp': datetime.now().isoformat()})
+                
+                async for event in google_adk_system.stream_analysis(
+                    session_id=request.session_id,
+                    user_query=request.user_query,
+                    personas=personas,
+                    max_concurrency=request.max_concurrency,
+                    use_cache=not request.bypass_cache,
+                    quorum=request.quorum,
+                    deadline=request.deadline_seconds
+                ):
+                    if event["type"] == "completed":
+                        await store_session_result(request.session_id, event["result"])
+                    yield sse_event(event)
+                
+            except Exception as e:
+                yield sse_event({'type': 'error', 'message': f'Stream error: {str(e)}', 'timestamp': datetime.now().isoformat()})
+        
+    return StreamingResponse(
+        generate_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 @app.post("/multi-agent/analyze", response_model=MultiAgentResponse)
 async def run_multi_agent_analysis(request: MultiAgentRequest, background_tasks: BackgroundTasks):
     """Run multi-agent analysis using LangGraph"""
     
+    with metrics.track_analysis("multi-agent/analyze"), tracer.span("POST /multi-agent/analyze", session_id=request.session_id):
+        try:
+            # Fetch persona data from TypeScript API
+            personas = await load_personas(request.persona_ids)
+            
+            if not personas:
+                raise HTTPException(status_code=400, detail="No valid personas found")
+            
+            result = await run_framework_analysis(request, personas)
+
+            # Store updates for streaming
+            await store_session_result(request.session_id, result)
+
+            # Send updates back to TypeScript API in background
+            background_tasks.add_task(send_updates_to_typescript, request.session_id, result, tracer.inject({}))
+
+            return MultiAgentResponse(**result)
+            
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
+
+async def run_framework_analysis(request: MultiAgentRequest, personas: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Check framework availability and run the analysis"""
+    if request.framework == "google-adk":
+        google_adk_system = framework_backends.get("google-adk")
+        if not google_adk_system:
+            raise HTTPException(status_code=503, detail="Google ADK system not available")
+        return await google_adk_system.run_analysis(
+            session_id=request.session_id,
+            user_query=request.user_query,
+            personas=personas,
+            max_concurrency=request.max_concurrency,
+            use_cache=not request.bypass_cache,
+            quorum=request.quorum,
+            deadline=request.deadline_seconds
+        )
+    elif request.framework == "langgraph":
+        langgraph_system = framework_backends.get("langgraph")
+        if not langgraph_system:
+            raise HTTPException(status_code=503, detail="LangGraph system not available")
+        return await langgraph_system.run_analysis(
+            session_id=request.session_id,
+            user_query=request.user_query,
+            personas=personas,
+            quorum=request.quorum,
+            deadline=request.deadline_seconds,
+            use_llm_analyst=request.use_llm_analyst
+        )
+    raise HTTPException(status_code=400, detail=f"Unsupported framework: {request.framework}")
+
+class MultiAgentJobRequest(MultiAgentRequest):
+    priority: str = "normal"  # high | normal | low
+
+async def run_analysis_job(job: Job) -> Dict[str, Any]:
+    """Job runner: the /multi-agent/analyze pipeline, reporting progress on the job"""
+    request: MultiAgentJobRequest = job.payload
+    subscription = session_events.subscribe(request.session_id)
+    
+    async def track_progress():
+        # Count partial results as coordinators publish them
+        while (event := await subscription.get()) is not None:
+            kind = event.get("type") or event.get("action")  # LangGraph events use "action"
+            if kind in ("persona_completed", "persona_error", "persona_response"):
+                job.progress["completed_personas"] = job.progress.get("completed_personas", 0) + 1
+            elif kind in ("synthesis_start", "synthesis_completed", "synthesis_complete"):
+                job.progress["stage"] = "synthesis"
+        if subscription.overflowed:
+            # Dropped by the event bus for falling behind: counts stop here, the job itself carries on
+            job.progress["progress_stale"] = True
+            logger.warning("Progress tracking for job %s fell behind and stopped updating", job.id)
+    
+    tracker = asyncio.create_task(track_progress())
+    with tracer.span("job multi-agent/analyze", job_id=job.id, session_id=request.session_id):
+        try:
+            job.progress["stage"] = "loading_personas"
+            personas = await load_personas(request.persona_ids)
+            if not personas:
+                raise HTTPException(status_code=400, detail="No valid personas found")
+            
+            job.progress.update(stage="analyzing", total_personas=len(personas), completed_personas=0)
+            with metrics.track_analysis("multi-agent/jobs"):
+                result = await run_framework_analysis(request, personas)
+            
+            job.progress["stage"] = "storing"
+            await store_session_result(request.session_id, result)
+            await send_updates_to_typescript(request.session_id, result)
+            job.progress["stage"] = "done"
+            return result
+        except HTTPException as e:
+            raise Exception(e.detail)
+        finally:
+            subscription.close()
+            tracker.cancel()
+
+job_queue = JobQueue(run_analysis_job)
+metrics.job_queue_depth.set_function(lambda: job_queue.queued)
+metrics.rate_limiter_waiting.set_function(lambda: grok_rate_limiter.stats()["waiting"])
+
+@app.post("/multi-agent/jobs", status_code=202)
+async def submit_analysis_job(request: MultiAgentJobRequest):
+    """Queue an analysis and return its job ID immediately"""
     try:
-        # Fetch persona data from TypeScript API
-        personas = []
-        # Use environment variable for API base URL, fallback to localhost for development
-        api_base_url = os.getenv('TYPESCRIPT_API_URL', 'http://localhost:3000')
-        
-        async with httpx.AsyncClient() as client:
-            for persona_id in request.persona_ids:
-                try:
-                    response = await client.get(
-                        f"{api_base_url}/api/personas/{persona_id}",
-                        headers={"Authorization": f"Bearer {os.getenv('API_TOKEN')}"},
-                        timeout=10.0
-                    )
-                    if response.status_code == 200:
-                        personas.append(response.json())
-                    else:
-                        print(f"Failed to fetch persona {persona_id}: {response.status_code}")
-                except Exception as e:
-                    print(f"Error fetching persona {persona_id}: {e}")
-        
-        if not personas:
-            raise HTTPException(status_code=400, detail="No valid personas found")
-        
-        # Check framework availability and run analysis
-        if request.framework == "google-adk":
-            if not google_adk_system:
-                raise HTTPException(status_code=503, detail="Google ADK system not available")
-            result = await google_adk_system.run_analysis(
-                session_id=request.session_id,
-                user_query=request.user_query,
-                personas=personas
-            )
-        elif request.framework == "langgraph":
-            if not langgraph_system:
-                raise HTTPException(status_code=503, detail="LangGraph system not available")
-            result = await langgraph_system.run_analysis(
-                session_id=request.session_id,
-                user_query=request.user_query,
-                personas=personas
-            )
-        else:
-            raise HTTPException(status_code=400, detail=f"Unsupported framework: {request.framework}")
+        job = job_queue.submit(request, priority=request.priority)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except QueueFullError as e:
+        return JSONResponse(status_code=429, content={"detail": str(e)}, headers={"Retry-After": "5"})
+    
+    return {"job_id": job.id, "status": job.status, "session_id": request.session_id}
 
-        # Store updates for streaming
-        session_updates[request.session_id] = result
+@app.get("/multi-agent/jobs/{job_id}")
+async def get_analysis_job(job_id: str):
+    """Report a job's status and progress"""
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.as_dict()
 
-        # Send updates back to TypeScript API in background
-        background_tasks.add_task(send_updates_to_typescript, request.session_id, result)
+@app.get("/multi-agent/jobs/{job_id}/result", response_model=MultiAgentResponse)
+async def get_analysis_job_result(job_id: str):
+    """Return a completed job's result (202 while it is still pending)"""
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job.status == "completed":
+        return MultiAgentResponse(**job.result)
+    if job.finished:
+        raise HTTPException(status_code=409, detail=f"Job {job.status}: {job.error or 'no result'}")
+    return JSONResponse(status_code=202, content=job.as_dict())
 
-        return MultiAgentResponse(**result)
-        
-        # Store updates for streaming
-        session_updates[request.session_id] = result
-        
-        # Send updates back to TypeScript API in background
-        background_tasks.add_task(send_updates_to_typescript, request.session_id, result)
-        
-        return MultiAgentResponse(**result)
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
+@app.delete("/multi-agent/jobs/{job_id}")
+async def cancel_analysis_job(job_id: str):
+    """Cancel a queued or running job"""
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return {"job_id": job_id, "cancelled": job_queue.cancel(job_id)}
+
+@app.get("/debug/jobs")
+async def debug_jobs():
+    """Debug endpoint to inspect job queue depth and workers"""
+    return job_queue.stats()
 
 @app.get("/multi-agent/session/{session_id}/events")
 async def get_session_events(session_id: str):
     """Get real-time coordination events for a session"""
     
-    if session_id in session_updates:
+    result = await session_store.get(session_id)
+    if result is not None:
         return {
             "session_id": session_id,
-            "coordination_events": session_updates[session_id].get("coordination_events", []),
-            "status": "active" if session_id in session_updates else "completed"
+            "coordination_events": result.get("coordination_events", []),
+            "status": result.get("status", "completed")
         }
     
     return {"session_id": session_id, "coordination_events": [], "status": "not_found"}
 
-async def send_updates_to_typescript(session_id: str, result: Dict[str, Any]):
-    """Send analysis results back to TypeScript API"""
+async def store_session_result(session_id: str, result: Dict[str, Any]):
+    """Persist the final result and push it to live subscribers"""
+    await session_store.set(session_id, result)
+    session_events.publish(session_id, {
+        "type": "completed",
+        "result": result,
+        "timestamp": datetime.now().isoformat()
+    })
+
+async def send_updates_to_typescript(
+    session_id: str,
+    result: Dict[str, Any],
+    trace_headers: Optional[Dict[str, str]] = None
+):
+    """Send analysis results back to TypeScript API
+    
+    Background tasks run after the request span has closed, so callers pass
+    the trace headers captured while it was still open.
+    """
     
     try:
         api_base_url = os.getenv('TYPESCRIPT_API_URL', 'http://localhost:3000')
-        async with httpx.AsyncClient() as client:
-            await client.post(
-                f"{api_base_url}/api/multi-agent-sessions/{session_id}/update",
-                json=result,
-                headers={"Authorization": f"Bearer {os.getenv('API_TOKEN')}"}
-            )
+        await http_pool.get("typescript").post(
+            f"{api_base_url}/api/multi-agent-sessions/{session_id}/update",
+            json=result,
+            headers={
+                **(trace_headers or tracer.inject({})),
+                "Authorization": f"Bearer {os.getenv('API_TOKEN')}"
+            }
+        )
     except Exception as e:
-        print(f"Failed to send updates to TypeScript: {e}")
+        logger.warning("Failed to send updates to TypeScript: %s", e)
 
 @app.websocket("/multi-agent/session/{session_id}/stream")
-async def websocket_endpoint(websocket, session_id: str):
-    """WebSocket endpoint for real-time updates"""
+async def websocket_endpoint(websocket: WebSocket, session_id: str):
+    """WebSocket endpoint for real-time updates
+    
+    Sends the stored result once as a ``snapshot`` (if any), then pushes only
+    new events as coordinators publish them. A subscriber that falls too far
+    behind is closed with code 1013 and should reconnect to resync; an
+    unexpected server error closes it with 1011.
+    """
     
     await websocket.accept()
+    metrics.websocket_connections.inc()
+    subscription = session_events.subscribe(session_id)
+    disconnected = asyncio.create_task(_wait_for_disconnect(websocket))
     
     try:
+        snapshot = await session_store.get(session_id)
+        if snapshot is not None:
+            await websocket.send_json({"type": "snapshot", "result": snapshot})
+        
         while True:
-            # Send current session updates
-            if session_id in session_updates:
-                await websocket.send_json(session_updates[session_id])
+            next_event = asyncio.create_task(subscription.get())
+            await asyncio.wait({next_event, disconnected}, return_when=asyncio.FIRST_COMPLETED)
+            if disconnected.done():
+                next_event.cancel()
+                break
             
-            await asyncio.sleep(1)  # Send updates every second
+            event = next_event.result()
+            if event is None:
+                await websocket.close(code=1013, reason="Subscriber too slow, reconnect to resync")
+                break
+            await websocket.send_json(event)
             
+    except WebSocketDisconnect:
+        pass
     except Exception as e:
-        print(f"WebSocket error: {e}")
+        logger.warning("WebSocket error: %s", e)
+        try:
+            await websocket.close(code=1011, reason="Internal error, reconnect to resync")
+        except Exception:
+            pass  # Socket already unusable; nothing more to tell the client
     finally:
-        await websocket.close()
+        subscription.close()
+        disconnected.cancel()
+        metrics.websocket_connections.dec()
+
+async def _wait_for_disconnect(websocket: WebSocket):
+    """Drain client messages until the socket closes"""
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                return
+    except Exception:
+        return
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,150 @@
+import os
+import re
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from typing import Any, Dict, List, Optional, Tuple
+
+from rate_limiter import estimate_tokens
+from synthesis_input import truncate_text
+
+# Compact persona profiles shared by every prompt builder
+PERSONA_DIGEST_MAX_TOKENS = int(os.getenv("PERSONA_DIGEST_MAX_TOKENS", "300"))
+PERSONA_DIGEST_CACHE_SIZE = int(os.getenv("PERSONA_DIGEST_CACHE_SIZE", "1000"))
+DIGEST_MAX_ITEMS = 8  # Traits/interests/tags kept per persona
+DIGEST_MAX_ITEM_CHARS = 60
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def _clean(value: Any) -> str:
+    return _WHITESPACE.sub(" ", str(value or "")).strip()
+
+
+def _items(value: Any) -> Tuple[str, ...]:
+    """Normalize a JSON list-ish persona field (list, dict or comma string) to short strings"""
+    if isinstance(value, str):
+        value = value.split(",")
+    elif isinstance(value, dict):
+        value = list(value)
+    elif not isinstance(value, (list, tuple)):
+        return ()
+    items = []
+    for item in value:
+        if isinstance(item, dict):
+            item = item.get("name") or item.get("label") or item.get("value") or ""
+        text = _clean(item)[:DIGEST_MAX_ITEM_CHARS]
+        if text and text not in items:
+            items.append(text)
+    return tuple(items[:DIGEST_MAX_ITEMS])
+
+
+@dataclass(frozen=True)
+class PersonaDigest:
+    """Compact, token-bounded profile of one persona version
+
+    Holds only the fields agents put in prompts; attachments, metadata,
+    inclusivity attributes, applied suggestions and the like are dropped.
+    """
+    id: Optional[str]
+    version: Optional[str]
+    name: str
+    occupation: str
+    location: str
+    age: Optional[int]
+    traits: Tuple[str, ...]
+    interests: Tuple[str, ...]
+    tags: Tuple[str, ...]
+    introduction: str
+    tokens: int = 0
+
+    def profile_lines(self, introduction: bool = True) -> List[str]:
+        lines = [f"You are {self.name}, a {self.occupation or 'person'} from {self.location or 'somewhere'}."]
+        if self.age:
+            lines.append(f"Age: {self.age}")
+        if self.traits:
+            lines.append(f"Personality: {', '.join(self.traits)}")
+        if self.interests:
+            lines.append(f"Interests: {', '.join(self.interests)}")
+        if introduction and self.introduction:
+            lines.append(f"Introduction: {self.introduction}")
+        return lines
+
+    def profile(self, introduction: bool = True) -> str:
+        return "\n".join(self.profile_lines(introduction))
+
+    def search_text(self) -> str:
+        """Words describing what the persona knows and cares about, for relevance routing"""
+        return " ".join([self.occupation, *self.traits, *self.interests, *self.tags, self.introduction, self.location])
+
+
+def build_digest(persona: Dict[str, Any], max_tokens: int = PERSONA_DIGEST_MAX_TOKENS) -> PersonaDigest:
+    """Normalize a persona document into a digest of at most about ``max_tokens``
+
+    The introduction is the only free-text field, so it absorbs the cut
+    when the profile is over budget.
+    """
+    age = persona.get("age")
+    digest = PersonaDigest(
+        id=persona.get("id"),
+        version=str(persona["updatedAt"]) if persona.get("updatedAt") else None,
+        name=_clean(persona.get("name")) or "Unknown",
+        occupation=_clean(persona.get("occupation")),
+        location=_clean(persona.get("location")),
+        age=age if isinstance(age, int) and age > 0 else None,
+        traits=_items(persona.get("personalityTraits")),
+        interests=_items(persona.get("interests")),
+        tags=_items(persona.get("tags")),
+        introduction=_clean(persona.get("introduction")),
+    )
+    tokens = estimate_tokens(digest.profile())
+    if tokens > max_tokens and digest.introduction:
+        fixed = estimate_tokens(digest.profile(introduction=False) + "\nIntroduction: ")
+        introduction = truncate_text(digest.introduction, max(0, max_tokens - fixed))
+        digest = replace(digest, introduction=introduction)
+        tokens = estimate_tokens(digest.profile())
+    return replace(digest, tokens=tokens)
+
+
+class PersonaDigestCache:
+    """Digests computed once per persona version, keyed by ID + ``updatedAt``
+
+    Personas without ``updatedAt`` are digested on every call, since a
+    stale digest could not be told apart from a current one.
+    """
+
+    def __init__(self, max_entries: int = PERSONA_DIGEST_CACHE_SIZE, max_tokens: int = PERSONA_DIGEST_MAX_TOKENS):
+        self.max_entries = max_entries
+        self.max_tokens = max_tokens
+        self._digests: "OrderedDict[Tuple[str, str], PersonaDigest]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, persona: Dict[str, Any]) -> PersonaDigest:
+        if not persona.get("id") or not persona.get("updatedAt"):
+            self.misses += 1
+            return build_digest(persona, self.max_tokens)
+
+        key = (persona["id"], str(persona["updatedAt"]))
+        digest = self._digests.get(key)
+        if digest is not None:
+            self._digests.move_to_end(key)
+            self.hits += 1
+            return digest
+        self.misses += 1
+        digest = self._digests[key] = build_digest(persona, self.max_tokens)
+        while len(self._digests) > self.max_entries:
+            self._digests.popitem(last=False)
+        return digest
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._digests),
+            "max_entries": self.max_entries,
+            "max_tokens": self.max_tokens,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+# Global instance shared by the prompt builders and the persona router
+persona_digests = PersonaDigestCache()
@@ -0,0 +1,276 @@
+import os
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Any, Optional, Tuple
+
+import httpx
+
+from http_pool import http_pool
+from metrics import persona_cache_lookups, persona_fetch_seconds
+from tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+# Persona document cache tuning
+PERSONA_CACHE_TTL = float(os.getenv("PERSONA_CACHE_TTL", "300"))
+PERSONA_CACHE_MAX_ENTRIES = int(os.getenv("PERSONA_CACHE_MAX_ENTRIES", "500"))
+PERSONA_FETCH_TIMEOUT = float(os.getenv("PERSONA_FETCH_TIMEOUT", "10"))
+PERSONA_BULK_MAX_IDS = int(os.getenv("PERSONA_BULK_MAX_IDS", "50"))
+# How long to stop trying the bulk route after the API says it does not exist
+PERSONA_BULK_RETRY_AFTER = 300.0
+
+
+class PersonaLoadError(Exception):
+    """Raised when a persona cannot be fetched from the TypeScript API"""
+
+    def __init__(self, persona_id: str, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.persona_id = persona_id
+        self.status_code = status_code
+
+
+class BulkFetchUnavailable(Exception):
+    """The bulk persona route failed or is not deployed; fall back to per-ID fetches"""
+
+
+@dataclass
+class CachedPersona:
+    """A cached persona document and the validator needed to revalidate it"""
+    data: Dict[str, Any]
+    etag: Optional[str]
+    expires_at: float
+
+
+class PersonaLoader:
+    """Concurrent, cached loader for persona documents from the TypeScript API
+
+    - All requested IDs are fetched concurrently over the shared HTTP pool.
+    - Cache misses are pulled in one round-trip via GET /api/personas?ids=...,
+      falling back to per-ID fetches when the bulk route is unavailable.
+    - Concurrent loads of the same ID share a single in-flight request.
+    - Documents are kept in a TTL + LRU cache; expired entries are revalidated
+      with If-None-Match when the API returned an ETag.
+    """
+
+    def __init__(
+        self,
+        ttl: float = PERSONA_CACHE_TTL,
+        max_entries: int = PERSONA_CACHE_MAX_ENTRIES,
+        timeout: float = PERSONA_FETCH_TIMEOUT,
+        bulk_max_ids: int = PERSONA_BULK_MAX_IDS
+    ):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.timeout = timeout
+        self.bulk_max_ids = bulk_max_ids
+        self._bulk_disabled_until = 0.0
+        self._cache: "OrderedDict[str, CachedPersona]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+        self.bulk_requests = 0
+
+    @property
+    def api_base_url(self) -> str:
+        return os.getenv('TYPESCRIPT_API_URL', 'http://localhost:3000')
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        return http_pool.get("typescript")
+
+    def _headers(self) -> Dict[str, str]:
+        return tracer.inject({"Authorization": f"Bearer {os.getenv('API_TOKEN')}"})
+
+    async def load_many(self, persona_ids: List[str]) -> Tuple[List[Dict[str, Any]], List[PersonaLoadError]]:
+        """Load personas concurrently, preserving request order
+
+        Returns the personas that loaded and the errors for those that did not.
+        """
+        self._prefetch_bulk(persona_ids)
+        results = await asyncio.gather(
+            *(self.load(persona_id) for persona_id in persona_ids),
+            return_exceptions=True
+        )
+
+        personas = []
+        errors = []
+        for persona_id, result in zip(persona_ids, results):
+            if isinstance(result, PersonaLoadError):
+                errors.append(result)
+            elif isinstance(result, BaseException):
+                errors.append(PersonaLoadError(persona_id, f"Error fetching persona {persona_id}: {result}"))
+            else:
+                personas.append(result)
+        return personas, errors
+
+    def _is_fresh(self, persona_id: str) -> bool:
+        entry = self._cache.get(persona_id)
+        return entry is not None and entry.expires_at > time.monotonic()
+
+    def _prefetch_bulk(self, persona_ids: List[str]):
+        """Start one bulk request per chunk of cache misses
+
+        Each missing ID gets an in-flight future backed by the bulk request,
+        so the per-ID loads that follow (and any concurrent callers) join it.
+        """
+        if time.monotonic() < self._bulk_disabled_until:
+            return
+
+        pending = [
+            persona_id for persona_id in dict.fromkeys(persona_ids)
+            if persona_id not in self._inflight and not self._is_fresh(persona_id)
+        ]
+        if len(pending) < 2:
+            return
+
+        for start in range(0, len(pending), self.bulk_max_ids):
+            chunk = pending[start:start + self.bulk_max_ids]
+            bulk = asyncio.ensure_future(self._fetch_bulk(chunk))
+            bulk.add_done_callback(lambda done: done.cancelled() or done.exception())
+            for persona_id in chunk:
+                self.misses += 1
+                persona_cache_lookups.inc(result="miss")
+                task = asyncio.ensure_future(self._from_bulk(bulk, persona_id))
+                self._inflight[persona_id] = task
+                task.add_done_callback(lambda done, pid=persona_id: self._finish_inflight(pid, done))
+
+    async def load(self, persona_id: str) -> Dict[str, Any]:
+        """Load a single persona, from cache when fresh"""
+        entry = self._cache.get(persona_id)
+        if entry is not None and entry.expires_at > time.monotonic():
+            self._cache.move_to_end(persona_id)
+            self.hits += 1
+            persona_cache_lookups.inc(result="hit")
+            return entry.data
+
+        inflight = self._inflight.get(persona_id)
+        if inflight is None:
+            self.misses += 1
+            persona_cache_lookups.inc(result="miss")
+            inflight = asyncio.ensure_future(self._fetch(persona_id, entry))
+            self._inflight[persona_id] = inflight
+            inflight.add_done_callback(lambda task: self._finish_inflight(persona_id, task))
+
+        # Shield so one cancelled caller does not cancel the shared request
+        return await asyncio.shield(inflight)
+
+    def _finish_inflight(self, persona_id: str, task: asyncio.Future):
+        if self._inflight.get(persona_id) is task:
+            del self._inflight[persona_id]
+        if not task.cancelled():
+            task.exception()  # Mark as retrieved even if every caller went away
+
+    async def _fetch(self, persona_id: str, entry: Optional[CachedPersona]) -> Dict[str, Any]:
+        try:
+            with persona_fetch_seconds.time(kind="single"), tracer.span("persona_fetch.http", persona_id=persona_id):
+                headers = self._headers()
+                if entry is not None and entry.etag:
+                    headers["If-None-Match"] = entry.etag
+                response = await self.client.get(
+                    f"{self.api_base_url}/api/personas/{persona_id}",
+                    headers=headers,
+                    timeout=self.timeout
+                )
+        except Exception as e:
+            raise PersonaLoadError(persona_id, f"Error fetching persona {persona_id}: {e}")
+
+        if response.status_code == 304 and entry is not None:
+            self.revalidated += 1
+            self._store(persona_id, entry.data, entry.etag)
+            return entry.data
+
+        if response.status_code != 200:
+            raise PersonaLoadError(
+                persona_id,
+                f"Failed to fetch persona {persona_id}: {response.status_code}",
+                status_code=response.status_code
+            )
+
+        data = response.json()
+        self._store(persona_id, data, response.headers.get("etag"))
+        return data
+
+    async def _fetch_bulk(self, persona_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Fetch several personas in one request; returns persona documents by ID"""
+        self.bulk_requests += 1
+        try:
+            with persona_fetch_seconds.time(kind="bulk"), tracer.span("persona_fetch.bulk", count=len(persona_ids)):
+                response = await self.client.get(
+                    f"{self.api_base_url}/api/personas",
+                    params={"ids": ",".join(persona_ids)},
+                    headers=self._headers(),
+                    timeout=self.timeout
+                )
+        except Exception as e:
+            raise BulkFetchUnavailable(str(e))
+
+        if response.status_code in (404, 405, 501):
+            self._bulk_disabled_until = time.monotonic() + PERSONA_BULK_RETRY_AFTER
+            raise BulkFetchUnavailable(f"Bulk persona route unavailable: {response.status_code}")
+        if response.status_code != 200:
+            raise BulkFetchUnavailable(f"Bulk persona fetch failed: {response.status_code}")
+
+        body = response.json()
+        if not isinstance(body, dict) or "personas" not in body:
+            # Older API ignores ?ids= and returns every persona as a list
+            self._bulk_disabled_until = time.monotonic() + PERSONA_BULK_RETRY_AFTER
+            raise BulkFetchUnavailable("Bulk persona route not supported by API")
+
+        etags = body.get("etags") or {}
+        found = {}
+        for persona in body["personas"]:
+            persona_id = persona.get("id")
+            found[persona_id] = persona
+            self._store(persona_id, persona, etags.get(persona_id))
+        return found
+
+    async def _from_bulk(self, bulk: asyncio.Future, persona_id: str) -> Dict[str, Any]:
+        """Resolve one persona from a shared bulk request, or fetch it alone on failure"""
+        try:
+            found = await asyncio.shield(bulk)
+        except BulkFetchUnavailable as e:
+            logger.info("%s; fetching persona %s individually", e, persona_id)
+            return await self._fetch(persona_id, self._cache.get(persona_id))
+
+        if persona_id not in found:
+            raise PersonaLoadError(persona_id, f"Failed to fetch persona {persona_id}: 404", status_code=404)
+        return found[persona_id]
+
+    def _store(self, persona_id: str, data: Dict[str, Any], etag: Optional[str]):
+        self._cache[persona_id] = CachedPersona(
+            data=data,
+            etag=etag,
+            expires_at=time.monotonic() + self.ttl
+        )
+        self._cache.move_to_end(persona_id)
+        while len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+
+    def invalidate(self, persona_id: Optional[str] = None) -> int:
+        """Drop one persona (or the whole cache); returns the number of entries removed"""
+        if persona_id is None:
+            removed = len(self._cache)
+            self._cache.clear()
+            return removed
+        return 1 if self._cache.pop(persona_id, None) is not None else 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._cache),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl,
+            "in_flight": len(self._inflight),
+            "hits": self.hits,
+            "misses": self.misses,
+            "revalidated": self.revalidated,
+            "bulk_requests": self.bulk_requests,
+            "bulk_enabled": time.monotonic() >= self._bulk_disabled_until,
+        }
+
+
+# Global instance shared by all analyze endpoints
+persona_loader = PersonaLoader()
@@ -0,0 +1,81 @@
+import os
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from persona_digest import PersonaDigest, persona_digests
+
+# Compiled persona system prompts kept per persona version
+PROMPT_PREFIX_CACHE_SIZE = int(os.getenv("PROMPT_PREFIX_CACHE_SIZE", "1000"))
+
+# Closing instruction per prompt style; part of the cached prefix, so keep them fixed
+STYLE_INSTRUCTIONS = {
+    "brief": "Answer each question in 2-3 sentences, briefly and authentically, from your perspective.",
+    "full": (
+        "Answer each question from your unique perspective. Be authentic to your persona while "
+        "providing valuable insights. Provide a thoughtful 2-3 paragraph response."
+    ),
+}
+
+
+def _compile(digest: PersonaDigest, style: str) -> str:
+    lines = digest.profile_lines(introduction=style == "full")
+    lines.append("")
+    lines.append(STYLE_INSTRUCTIONS[style])
+    return "\n".join(lines)
+
+
+def user_turn(user_query: str, context: Optional[str] = None) -> str:
+    """The per-request part of a persona prompt, sent after the stable prefix"""
+    if context:
+        return f"Context: {context}\n\nQuestion: {user_query}"
+    return f"Question: {user_query}"
+
+
+class PersonaPromptBuilder:
+    """Byte-stable persona system prompts, compiled once per persona version
+
+    Everything static about a persona (its digest) goes into the system
+    message and the query goes last, so repeat calls for the same persona
+    share a prompt prefix the upstream can cache. Prefixes are keyed by
+    persona ID, ``updatedAt`` and style; personas without ``updatedAt`` are
+    compiled on every call (still deterministically) since staleness can't
+    be told.
+    """
+
+    def __init__(self, max_entries: int = PROMPT_PREFIX_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._prefixes: "OrderedDict[Tuple[Any, str, str], str]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def system_prefix(self, persona: Dict[str, Any], style: str = "brief") -> str:
+        if style not in STYLE_INSTRUCTIONS:
+            raise ValueError(f"Unknown prompt style: {style}")
+        digest = persona_digests.get(persona)
+        if digest.id is None or digest.version is None:
+            self.misses += 1
+            return _compile(digest, style)
+
+        key = (digest.id, digest.version, style)
+        prefix = self._prefixes.get(key)
+        if prefix is not None:
+            self._prefixes.move_to_end(key)
+            self.hits += 1
+            return prefix
+        self.misses += 1
+        prefix = self._prefixes[key] = _compile(digest, style)
+        while len(self._prefixes) > self.max_entries:
+            self._prefixes.popitem(last=False)
+        return prefix
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._prefixes),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+# Global instance shared by the persona prompt builders of both frameworks
+persona_prompts = PersonaPromptBuilder()
@@ -0,0 +1,145 @@
+import os
+import math
+import re
+import time
+from collections import Counter, OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Tuple
+
+from persona_digest import persona_digests
+
+# Local persona routing tuning
+# Keep at most this many personas per query (0 = keep every requested persona, ranked)
+ROUTER_TOP_K = int(os.getenv("ROUTER_TOP_K", "0"))
+# Drop personas scoring below this cosine similarity (0 = keep all)
+ROUTER_MIN_SCORE = float(os.getenv("ROUTER_MIN_SCORE", "0"))
+ROUTER_INDEX_MAX_ENTRIES = int(os.getenv("ROUTER_INDEX_MAX_ENTRIES", "2000"))
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+STOPWORDS = frozenset("""
+    a about an and are as at be been but by can could do does for from has have how i if in into is it its
+    me my of on or our so than that the their them there these they this to too was we were what when where
+    which who why will with would you your
+""".split())
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased word tokens without stopwords, with a naive plural strip"""
+    tokens = []
+    for token in _TOKEN.findall(text.lower()):
+        if len(token) < 2 or token in STOPWORDS:
+            continue
+        if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+
+@dataclass
+class RoutingResult:
+    """Personas ranked by relevance to a query"""
+    ranked: List[Tuple[Dict[str, Any], float]]
+    elapsed_ms: float
+    scores: Dict[str, float] = field(default_factory=dict)
+
+    @property
+    def personas(self) -> List[Dict[str, Any]]:
+        return [persona for persona, _ in self.ranked]
+
+
+class PersonaRouter:
+    """In-process TF-IDF relevance scoring of personas against a query
+
+    Term counts are computed once per persona version (ID + updatedAt) and
+    kept in an LRU index holding the latest version of each persona;
+    document frequencies cover every indexed persona, so IDF reflects the
+    whole persona population rather than one request.
+    Scoring a query is a sparse dot product per persona.
+    """
+
+    def __init__(self, max_entries: int = ROUTER_INDEX_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._index: "OrderedDict[Any, Tuple[Any, Counter]]" = OrderedDict()  # persona -> (version, terms)
+        self._document_frequency: Counter = Counter()
+        self.routes = 0
+
+    def _forget(self, terms: Counter):
+        for term in terms:
+            self._document_frequency[term] -= 1
+            if self._document_frequency[term] <= 0:
+                del self._document_frequency[term]
+
+    def _terms(self, persona: Dict[str, Any]) -> Counter:
+        digest = persona_digests.get(persona)
+        text = digest.search_text()
+        key = digest.id or digest.name
+        version = digest.version or hash(text)
+        entry = self._index.get(key)
+        if entry is not None:
+            self._index.move_to_end(key)
+            if entry[0] == version:
+                return entry[1]
+            self._forget(entry[1])  # Persona was edited: its old terms no longer count
+        terms = Counter(tokenize(text))
+        self._index[key] = (version, terms)
+        self._document_frequency.update(terms.keys())
+        while len(self._index) > self.max_entries:
+            _, (_, evicted) = self._index.popitem(last=False)
+            self._forget(evicted)
+        return terms
+
+    def _idf(self, term: str) -> float:
+        return math.log((1 + len(self._index)) / (1 + self._document_frequency[term])) + 1
+
+    def _vector(self, terms: Counter) -> Dict[str, float]:
+        vector = {term: (1 + math.log(count)) * self._idf(term) for term, count in terms.items()}
+        norm = math.sqrt(sum(weight * weight for weight in vector.values())) or 1.0
+        return {term: weight / norm for term, weight in vector.items()}
+
+    def route(
+        self,
+        query: str,
+        personas: List[Dict[str, Any]],
+        top_k: int = ROUTER_TOP_K,
+        min_score: float = ROUTER_MIN_SCORE
+    ) -> RoutingResult:
+        """Rank ``personas`` by cosine similarity to ``query``; ties keep request order
+
+        ``top_k`` and ``min_score`` trim the ranking; if no persona clears
+        ``min_score`` all of them are kept.
+        """
+        started = time.perf_counter()
+        self.routes += 1
+        persona_terms = [self._terms(persona) for persona in personas]
+        query_vector = self._vector(Counter(tokenize(query)))
+
+        scored = []
+        for position, (persona, terms) in enumerate(zip(personas, persona_terms)):
+            vector = self._vector(terms)
+            score = sum(weight * vector.get(term, 0.0) for term, weight in query_vector.items())
+            scored.append((round(score, 4), position, persona))
+        scored.sort(key=lambda item: (-item[0], item[1]))
+
+        ranked = [(persona, score) for score, _, persona in scored if score >= min_score]
+        if not ranked:
+            # Nothing clears the threshold: keep everyone rather than answer with no personas
+            ranked = [(persona, score) for score, _, persona in scored]
+        if top_k > 0:
+            ranked = ranked[:top_k]
+        return RoutingResult(
+            ranked=ranked,
+            elapsed_ms=round((time.perf_counter() - started) * 1000, 3),
+            scores={persona.get("name", "Unknown"): score for persona, score in ranked}
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "indexed_personas": len(self._index),
+            "max_entries": self.max_entries,
+            "vocabulary": len(self._document_frequency),
+            "routes": self.routes,
+        }
+
+
+# Global instance shared by the LangGraph analyst step
+persona_router = PersonaRouter()
@@ -0,0 +1,103 @@
+import os
+import asyncio
+import math
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional
+
+# Persona phase cut-off; defaults wait for every persona, as before
+# Fraction of personas that must answer before synthesis may start
+PERSONA_QUORUM = float(os.getenv("PERSONA_QUORUM", "1.0"))
+# Seconds after the persona phase starts when synthesis starts regardless (0 = no deadline)
+PERSONA_DEADLINE = float(os.getenv("PERSONA_DEADLINE", "0"))
+# Extra seconds to wait for stragglers once the quorum is met
+PERSONA_QUORUM_GRACE = float(os.getenv("PERSONA_QUORUM_GRACE", "0"))
+
+LATE_MESSAGE = "No response before synthesis started"
+
+
+@dataclass
+class QuorumResult:
+    """Results of the calls that finished in time, and the keys that did not"""
+    results: Dict[Hashable, Any]
+    late: List[Hashable] = field(default_factory=list)
+    quorum: int = 0
+    waited_ms: int = 0
+
+    def as_dict(self, label: Callable[[Hashable], Any] = str) -> Dict[str, Any]:
+        """Summary for results and events; ``label`` turns call keys into names"""
+        return {
+            "answered": len(self.results),
+            "late": [label(key) for key in self.late],
+            "quorum": self.quorum,
+            "waited_ms": self.waited_ms,
+        }
+
+
+def late_response(**fields: Any) -> Dict[str, Any]:
+    """Placeholder result for a persona cut off by the quorum or deadline"""
+    return {"response": LATE_MESSAGE, **fields, "timestamp": datetime.now().isoformat(), "error": True, "late": True}
+
+
+def quorum_settings(quorum: Optional[float] = None, deadline: Optional[float] = None) -> Dict[str, float]:
+    """Per-request overrides on top of the env defaults"""
+    return {
+        "quorum": min(1.0, max(0.0, PERSONA_QUORUM if quorum is None else quorum)),
+        "deadline": PERSONA_DEADLINE if deadline is None else max(0.0, deadline),
+        "grace": PERSONA_QUORUM_GRACE,
+    }
+
+
+async def gather_quorum(
+    calls: Dict[Hashable, Awaitable[Any]],
+    quorum: float = PERSONA_QUORUM,
+    deadline: float = PERSONA_DEADLINE,
+    grace: float = PERSONA_QUORUM_GRACE,
+    on_result: Optional[Callable[[Hashable, Any], None]] = None
+) -> QuorumResult:
+    """Run ``calls`` concurrently and return once enough of them have finished
+
+    Stops waiting when ``quorum`` (a fraction of the calls) have finished and
+    ``grace`` seconds have passed since, or when ``deadline`` seconds have
+    passed since the start, whichever comes first. Calls still running are
+    cancelled and reported in ``late``. Exceptions are returned as results,
+    like ``gather(return_exceptions=True)``. ``on_result`` is called as each
+    call finishes, so partial results can be published without waiting.
+    """
+    started = time.monotonic()
+    tasks = {asyncio.ensure_future(call): key for key, call in calls.items()}
+    needed = max(1, math.ceil(quorum * len(tasks))) if tasks else 0  # A quorum of 0 still waits for one answer
+    deadline_at = started + deadline if deadline > 0 else None
+    quorum_at = started if needed == 0 else None
+    finished: Dict[Hashable, Any] = {}
+    pending = set(tasks)
+
+    try:
+        while pending:
+            now = time.monotonic()
+            limits = [at for at in (deadline_at, quorum_at + grace if quorum_at is not None else None) if at is not None]
+            timeout = min(limits) - now if limits else None
+            if timeout is not None and timeout <= 0:
+                break
+            done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                key = tasks[task]
+                finished[key] = asyncio.CancelledError() if task.cancelled() else task.exception() or task.result()
+                if on_result is not None:
+                    on_result(key, finished[key])
+            if quorum_at is None and len(finished) >= needed:
+                quorum_at = time.monotonic()
+    finally:
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    order = list(calls)
+    return QuorumResult(
+        results={key: finished[key] for key in order if key in finished},
+        late=[key for key in order if key not in finished],
+        quorum=needed,
+        waited_ms=int((time.monotonic() - started) * 1000)
+    )
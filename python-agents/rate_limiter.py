@@ -0,0 +1,178 @@
+import os
+import asyncio
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, Optional
+
+from request_context import current_session_id
+
+# Upstream quota; 0 disables that dimension
+UPSTREAM_REQUESTS_PER_MINUTE = float(os.getenv("UPSTREAM_REQUESTS_PER_MINUTE", "480"))
+UPSTREAM_TOKENS_PER_MINUTE = float(os.getenv("UPSTREAM_TOKENS_PER_MINUTE", "400000"))
+# How much of the per-minute quota may be spent in a burst
+RATE_LIMIT_BURST_SECONDS = float(os.getenv("RATE_LIMIT_BURST_SECONDS", "10"))
+# Completion budget assumed when a call doesn't set max_tokens
+DEFAULT_COMPLETION_TOKENS = int(os.getenv("DEFAULT_COMPLETION_TOKENS", "500"))
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough prompt token count (~4 characters per token for English text)"""
+    return len(text) // 4 + 1
+
+
+class TokenBucket:
+    """Refills continuously at ``rate_per_minute``, holding at most a burst's worth"""
+
+    def __init__(self, rate_per_minute: float, burst_seconds: float = RATE_LIMIT_BURST_SECONDS):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = max(1.0, self.rate * burst_seconds)
+        self.level = self.capacity
+        self._updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until ``amount`` can be taken (requests larger than the bucket wait for a full one)"""
+        self._refill()
+        amount = min(amount, self.capacity)
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) / self.rate
+
+    def consume(self, amount: float):
+        self._refill()
+        self.level -= min(amount, self.capacity)
+
+    def adjust(self, delta: float):
+        """Correct an earlier estimate once the real cost is known (may go negative)"""
+        self._refill()
+        self.level = min(self.capacity, self.level - delta)
+
+
+@dataclass
+class _Waiter:
+    tokens: int
+    future: asyncio.Future
+    queued_at: float = field(default_factory=time.monotonic)
+
+
+class RateLimiter:
+    """Process-wide requests/min and tokens/min scheduler for one upstream
+
+    Calls that can't go out immediately wait in a per-session FIFO. A single
+    dispatcher serves the sessions round-robin, so one large analysis can't
+    starve the others, and releases each call as soon as both buckets allow.
+    When the upstream still answers 429, ``pause`` holds every call for the
+    Retry-After period instead of letting them all fail.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: float = UPSTREAM_REQUESTS_PER_MINUTE,
+        tokens_per_minute: float = UPSTREAM_TOKENS_PER_MINUTE,
+        burst_seconds: float = RATE_LIMIT_BURST_SECONDS
+    ):
+        self.requests = TokenBucket(requests_per_minute, burst_seconds) if requests_per_minute > 0 else None
+        self.tokens = TokenBucket(tokens_per_minute, burst_seconds) if tokens_per_minute > 0 else None
+        self._queues: "OrderedDict[str, Deque[_Waiter]]" = OrderedDict()
+        self._dispatcher: Optional[asyncio.Task] = None
+        self._paused_until = 0.0
+        self.granted = 0
+        self.delayed = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.pauses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.requests is not None or self.tokens is not None
+
+    def _wait_time(self, tokens: int) -> float:
+        wait = max(0.0, self._paused_until - time.monotonic())
+        if self.requests is not None:
+            wait = max(wait, self.requests.wait_time(1))
+        if self.tokens is not None:
+            wait = max(wait, self.tokens.wait_time(tokens))
+        return wait
+
+    def _consume(self, tokens: int):
+        if self.requests is not None:
+            self.requests.consume(1)
+        if self.tokens is not None:
+            self.tokens.consume(tokens)
+        self.granted += 1
+
+    async def acquire(self, tokens: int, session_id: Optional[str] = None) -> float:
+        """Wait for quota for one call of ``tokens`` estimated tokens; returns seconds waited"""
+        if not self.enabled:
+            return 0.0
+        if not self._queues and self._wait_time(tokens) == 0:
+            self._consume(tokens)
+            return 0.0
+
+        session_id = session_id or current_session_id.get() or "default"
+        waiter = _Waiter(tokens, asyncio.get_running_loop().create_future())
+        self._queues.setdefault(session_id, deque()).append(waiter)
+        self.delayed += 1
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.create_task(self._dispatch())
+
+        await waiter.future  # Cancelling the caller cancels the future; the dispatcher skips it
+        waited = time.monotonic() - waiter.queued_at
+        self.total_wait += waited
+        self.max_wait = max(self.max_wait, waited)
+        return waited
+
+    async def _dispatch(self):
+        while self._queues:
+            session_id, queue = next(iter(self._queues.items()))
+            waiter = queue[0]
+            if not waiter.future.done():
+                wait = self._wait_time(waiter.tokens)
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                    continue
+                self._consume(waiter.tokens)
+                waiter.future.set_result(None)
+
+            queue.popleft()
+            if queue:
+                self._queues.move_to_end(session_id)  # Round-robin across sessions
+            else:
+                del self._queues[session_id]
+
+    def settle(self, estimated_tokens: int, actual_tokens: Optional[int]):
+        """Replace a call's estimated token cost with the usage the upstream reported"""
+        if self.tokens is not None and actual_tokens is not None:
+            self.tokens.adjust(actual_tokens - estimated_tokens)
+
+    def pause(self, seconds: float):
+        """Hold every call for ``seconds``, e.g. after the upstream answered 429"""
+        if seconds <= 0:
+            return
+        self.pauses += 1
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "requests_per_minute": round(self.requests.rate * 60) if self.requests else None,
+            "tokens_per_minute": round(self.tokens.rate * 60) if self.tokens else None,
+            "available_requests": round(self.requests.level, 1) if self.requests else None,
+            "available_tokens": round(self.tokens.level) if self.tokens else None,
+            "waiting": sum(len(queue) for queue in self._queues.values()),
+            "waiting_sessions": len(self._queues),
+            "granted": self.granted,
+            "delayed": self.delayed,
+            "avg_wait_ms": round(self.total_wait / self.delayed * 1000, 1) if self.delayed else 0.0,
+            "max_wait_ms": round(self.max_wait * 1000, 1),
+            "pauses": self.pauses,
+        }
+
+
+# Global instance: both the GrokAPI and the LangGraph ChatOpenAI paths draw from it
+grok_rate_limiter = RateLimiter()
@@ -0,0 +1,10 @@
+from contextvars import ContextVar
+from typing import Optional
+
+# Session the current coroutine is working for. Set once at the entry point of
+# an analysis; tasks spawned from there (gather, create_task, LangGraph nodes)
+# inherit it, so deep helpers don't need the ID threaded through every call.
+current_session_id: ContextVar[Optional[str]] = ContextVar("current_session_id", default=None)
+
+# Persona an agent coroutine is answering as, for log correlation
+current_persona: ContextVar[Optional[str]] = ContextVar("current_persona", default=None)
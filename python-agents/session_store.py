@@ -0,0 +1,52 @@
+import os
+import json
+from typing import Dict, Any, Optional
+
+from completion_cache import CacheBackend, MemoryCacheBackend, SQLiteCacheBackend
+
+# Session store tuning
+SESSION_STORE_BACKEND = os.getenv("SESSION_STORE_BACKEND", "memory")  # memory | sqlite
+SESSION_STORE_TTL = float(os.getenv("SESSION_STORE_TTL", "3600"))
+SESSION_STORE_MAX_ENTRIES = int(os.getenv("SESSION_STORE_MAX_ENTRIES", "1000"))
+SESSION_STORE_MAX_BYTES = int(os.getenv("SESSION_STORE_MAX_BYTES", str(64 * 1024 * 1024)))
+SESSION_STORE_PATH = os.getenv("SESSION_STORE_PATH", "session_store.sqlite3")
+
+
+class SessionStore:
+    """Bounded, expiring store for analysis results keyed by session ID
+
+    Results are kept as JSON in a size-capped LRU backend with a TTL, so
+    memory is accounted in serialized bytes. The in-memory backend is per
+    process; the SQLite backend lives outside the process and is shared by
+    every uvicorn worker on the host and survives restarts.
+    """
+
+    def __init__(self, backend: CacheBackend):
+        self.backend = backend
+
+    async def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        raw = await self.backend.get(session_id)
+        return json.loads(raw) if raw is not None else None
+
+    async def set(self, session_id: str, result: Dict[str, Any]):
+        await self.backend.set(session_id, json.dumps(result, default=str))
+
+    async def delete(self, session_id: str) -> bool:
+        return await self.backend.delete(session_id)
+
+    async def stats(self) -> Dict[str, Any]:
+        return await self.backend.stats()
+
+
+def create_session_store(backend: str = SESSION_STORE_BACKEND) -> SessionStore:
+    """Build the configured session store"""
+    limits = dict(ttl=SESSION_STORE_TTL, max_entries=SESSION_STORE_MAX_ENTRIES, max_bytes=SESSION_STORE_MAX_BYTES)
+    if backend == "memory":
+        return SessionStore(MemoryCacheBackend(**limits))
+    if backend == "sqlite":
+        return SessionStore(SQLiteCacheBackend(path=SESSION_STORE_PATH, table="sessions", **limits))
+    raise ValueError(f"Unknown session store backend: {backend}")
+
+
+# Global instance used by the analyze, events and WebSocket endpoints
+session_store = create_session_store()
@@ -0,0 +1,126 @@
+import os
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, List
+
+from rate_limiter import estimate_tokens
+
+# Token budget for the persona responses inlined into a synthesis prompt
+SYNTHESIS_TOKEN_BUDGET = int(os.getenv("SYNTHESIS_TOKEN_BUDGET", "4000"))
+
+_WHITESPACE = re.compile(r"\s+")
+_SENTENCE_END = re.compile(r"[.!?][\"')\]]?\s")
+TRUNCATION_MARK = " [...]"
+
+
+@dataclass
+class SynthesisInput:
+    """Compact persona responses for a synthesis prompt, and what was cut to fit"""
+    text: str
+    tokens: int
+    budget: int
+    raw_tokens: int = 0  # Size before truncation
+    truncated: List[str] = field(default_factory=list)
+    unavailable: List[str] = field(default_factory=list)
+    late: List[str] = field(default_factory=list)  # Cut off by the persona quorum/deadline
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "responses_tokens": self.tokens,
+            "budget_tokens": self.budget,
+            "raw_tokens": self.raw_tokens,
+            "truncated_personas": self.truncated,
+            "unavailable_personas": self.unavailable,
+            "late_personas": self.late,
+        }
+
+
+def response_text(data: Any) -> str:
+    """Response text of one persona result, whitespace collapsed"""
+    if isinstance(data, dict):
+        data = data.get("response", "")
+    return _WHITESPACE.sub(" ", str(data)).strip()
+
+
+def is_error_response(data: Any) -> bool:
+    return isinstance(data, dict) and bool(data.get("error"))
+
+
+def truncate_text(text: str, max_tokens: int) -> str:
+    """Cut ``text`` to about ``max_tokens``, at a sentence boundary when one is close"""
+    max_chars = max(0, (max_tokens - 1) * 4 - len(TRUNCATION_MARK))
+    if len(text) <= max_chars:
+        return text
+    cut = text[:max_chars]
+    boundaries = [m.end() for m in _SENTENCE_END.finditer(cut + " ")]
+    if boundaries and boundaries[-1] > max_chars // 2:
+        cut = cut[:boundaries[-1]]
+    return cut.rstrip() + TRUNCATION_MARK
+
+
+def _fair_shares(needs: Dict[str, int], budget: int) -> Dict[str, int]:
+    """Split ``budget`` so short responses keep everything and long ones share the rest equally"""
+    shares = {}
+    remaining = budget
+    pending = sorted(needs, key=needs.get)
+    while pending:
+        share = remaining // len(pending)
+        name = pending[0]
+        if needs[name] > share:
+            # Everyone left needs more than an equal share: give each exactly that
+            for name in pending:
+                shares[name] = share
+            break
+        shares[name] = needs[name]
+        remaining -= needs[name]
+        pending.pop(0)
+    return shares
+
+
+def build_synthesis_input(responses: Dict[str, Any], budget: int = SYNTHESIS_TOKEN_BUDGET) -> SynthesisInput:
+    """Reduce ``{persona name: response}`` to one line per persona within ``budget`` tokens
+
+    Only the response text is kept (timestamps, IDs, model names and latency
+    fields are dropped) and whitespace is collapsed. Failed personas, and
+    late ones cut off by the quorum, are listed by name instead of inlining
+    their error messages. If the
+    responses still exceed the budget, the longest ones are truncated to an
+    equal share so every persona stays represented.
+    """
+    texts = {}
+    unavailable = []
+    late = []
+    for name, data in responses.items():
+        text = response_text(data)
+        if isinstance(data, dict) and data.get("late"):
+            late.append(name)
+        elif is_error_response(data) or not text:
+            unavailable.append(name)
+        else:
+            texts[name] = text
+
+    needs = {name: estimate_tokens(f"{name}: {text}") for name, text in texts.items()}
+    raw_tokens = sum(needs.values())
+    truncated = []
+    if raw_tokens > budget:
+        shares = _fair_shares(needs, budget)
+        for name, text in texts.items():
+            if needs[name] > shares[name]:
+                texts[name] = truncate_text(text, shares[name] - estimate_tokens(f"{name}: "))
+                truncated.append(name)
+
+    lines = [f"{name}: {text}" for name, text in texts.items()]
+    if unavailable:
+        lines.append(f"(No response from: {', '.join(unavailable)})")
+    if late:
+        lines.append(f"(Still answering when this synthesis was written, not included: {', '.join(late)})")
+    text = "\n".join(lines)
+    return SynthesisInput(
+        text=text,
+        tokens=estimate_tokens(text),
+        budget=budget,
+        raw_tokens=raw_tokens,
+        truncated=truncated,
+        unavailable=unavailable,
+        late=late
+    )
@@ -0,0 +1,57 @@
+import asyncio
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from job_queue import JobQueue
+
+
+class JobQueueStopTest(unittest.IsolatedAsyncioTestCase):
+    async def test_stop_while_job_running(self):
+        started = asyncio.Event()
+
+        async def runner(job):
+            started.set()
+            await asyncio.sleep(60)
+            return {}
+
+        queue = JobQueue(runner, workers=2)
+        await queue.start()
+        job = queue.submit({"query": "slow"})
+        await asyncio.wait_for(started.wait(), timeout=1)
+
+        await asyncio.wait_for(queue.stop(), timeout=1)
+
+        self.assertEqual(job.status, "cancelled")
+        self.assertEqual(queue.running, 0)
+        self.assertEqual(queue._worker_tasks, [])
+
+    async def test_cancelled_job_keeps_worker_alive(self):
+        started = asyncio.Event()
+
+        async def runner(job):
+            if job.payload == "slow":
+                started.set()
+                await asyncio.sleep(60)
+            return {"payload": job.payload}
+
+        queue = JobQueue(runner, workers=1)
+        await queue.start()
+        slow = queue.submit("slow")
+        await asyncio.wait_for(started.wait(), timeout=1)
+        queue.cancel(slow.id)
+        fast = queue.submit("fast")
+        for _ in range(100):
+            if fast.finished:
+                break
+            await asyncio.sleep(0.01)
+
+        self.assertEqual(slow.status, "cancelled")
+        self.assertEqual(fast.status, "completed")
+        await asyncio.wait_for(queue.stop(), timeout=1)
+
+
+if __name__ == "__main__":
+    unittest.main()
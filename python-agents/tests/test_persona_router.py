@@ -0,0 +1,31 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from persona_router import PersonaRouter
+
+
+class PersonaRouterIndexTest(unittest.TestCase):
+    def test_new_version_replaces_old_terms(self):
+        router = PersonaRouter()
+        persona = {"id": "p1", "updatedAt": "1", "name": "Ada", "occupation": "chef"}
+        router.route("food", [persona])
+        router.route("food", [{**persona, "updatedAt": "2", "occupation": "pilot"}])
+
+        self.assertEqual(router.stats()["indexed_personas"], 1)
+        self.assertEqual(dict(router._document_frequency), {"pilot": 1})
+
+    def test_ranks_by_relevance(self):
+        router = PersonaRouter()
+        chef = {"id": "p1", "name": "Ada", "occupation": "chef", "interests": ["cooking"]}
+        pilot = {"id": "p2", "name": "Grace", "occupation": "pilot", "interests": ["flying"]}
+
+        routing = router.route("flying lessons", [chef, pilot])
+
+        self.assertEqual([p["name"] for p in routing.personas], ["Grace", "Ada"])
+
+
+if __name__ == "__main__":
+    unittest.main()
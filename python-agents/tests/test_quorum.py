@@ -0,0 +1,37 @@
+import asyncio
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from quorum import gather_quorum
+
+
+async def answer(value, delay):
+    await asyncio.sleep(delay)
+    return value
+
+
+class GatherQuorumTest(unittest.IsolatedAsyncioTestCase):
+    async def test_zero_quorum_waits_for_first_answer(self):
+        phase = await gather_quorum({0: answer("fast", 0.01), 1: answer("slow", 60)}, quorum=0.0)
+
+        self.assertEqual(phase.quorum, 1)
+        self.assertEqual(phase.results, {0: "fast"})
+        self.assertEqual(phase.late, [1])
+
+    async def test_late_keys_are_labelled(self):
+        names = ["Ada", "Grace"]
+        phase = await gather_quorum({0: answer("fast", 0.01), 1: answer("slow", 60)}, quorum=0.5)
+
+        self.assertEqual(phase.as_dict(lambda index: names[index])["late"], ["Grace"])
+
+    async def test_no_calls(self):
+        phase = await gather_quorum({}, quorum=0.0)
+
+        self.assertEqual((phase.results, phase.late, phase.quorum), ({}, [], 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,106 @@
+import os
+import asyncio
+import logging
+import math
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
+
+from rate_limiter import estimate_tokens
+from synthesis_input import build_synthesis_input, is_error_response, response_text
+from tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+# Tiered (map-reduce) synthesis tuning
+SYNTHESIS_FAN_IN = int(os.getenv("SYNTHESIS_FAN_IN", "6"))  # Responses summarized per group call
+# Tiering switches on at this many successful personas, or this many response tokens
+SYNTHESIS_TIERED_MIN_PERSONAS = int(os.getenv("SYNTHESIS_TIERED_MIN_PERSONAS", "12"))
+SYNTHESIS_TIERED_MIN_TOKENS = int(os.getenv("SYNTHESIS_TIERED_MIN_TOKENS", "6000"))
+
+GROUP_SYSTEM_PROMPT = (
+    "You condense several people's answers for a later synthesis step. "
+    "Keep each view attached to the people who hold it."
+)
+
+# (prompt, system_prompt) -> completion text
+Complete = Callable[[str, str], Awaitable[str]]
+
+
+def needs_tiering(responses: Dict[str, Any]) -> bool:
+    """True when a single synthesis call over ``responses`` would be too large"""
+    texts = [response_text(data) for data in responses.values() if not is_error_response(data)]
+    if len(texts) >= SYNTHESIS_TIERED_MIN_PERSONAS:
+        return True
+    return sum(estimate_tokens(text) for text in texts) >= SYNTHESIS_TIERED_MIN_TOKENS
+
+
+def _group_prompt(user_query: str, group_text: str) -> str:
+    return f"""
+                Question: {user_query}
+
+                Responses:
+                {group_text}
+
+                Summarize these responses in one short paragraph: the main positions, who holds each, and where they disagree."""
+
+
+async def _summarize_group(
+    user_query: str,
+    group: Dict[str, Any],
+    complete: Complete,
+    tier: int
+) -> Dict[str, Any]:
+    group_input = build_synthesis_input(group)
+    with tracer.span("synthesis.group", tier=tier, size=len(group)) as span:
+        try:
+            summary = await complete(_group_prompt(user_query, group_input.text), GROUP_SYSTEM_PROMPT)
+        except Exception as e:
+            # Degrade to the compacted group text so the final synthesis still sees these views
+            logger.warning("Group summary failed at tier %d: %s", tier, e)
+            span.status = "error"
+            summary = group_input.text
+    return {"response": summary}
+
+
+async def reduce_responses(
+    user_query: str,
+    responses: Dict[str, Any],
+    complete: Complete,
+    fan_in: int = SYNTHESIS_FAN_IN
+) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """Summarize responses in parallel groups of ``fan_in`` until one synthesis call can take them
+
+    Returns responses keyed by group label (``"Group 1.1 (Ann, Bob, ...)"``)
+    to feed the usual synthesis prompt, plus a report of the tiers run.
+    Failed personas are passed through so the final prompt still lists them.
+    """
+    fan_in = max(2, fan_in)
+    failed = {name: data for name, data in responses.items() if is_error_response(data)}
+    current = {name: data for name, data in responses.items() if not is_error_response(data)}
+    members: Dict[str, List[str]] = {name: [name] for name in current}
+
+    tiers = []
+
+    with tracer.span("synthesis.reduce", responses=len(current), fan_in=fan_in):
+        # Always run one tier (at least two groups) so a few very long responses still get condensed
+        while len(current) > fan_in or (not tiers and len(current) > 1):
+            tier = len(tiers) + 1
+            names = list(current)
+            size = min(fan_in, math.ceil(len(names) / 2))
+            groups = [names[i:i + size] for i in range(0, len(names), size)]
+            summaries = await asyncio.gather(*(
+                _summarize_group(user_query, {name: current[name] for name in group}, complete, tier)
+                for group in groups
+            ))
+
+            next_current = {}
+            next_members = {}
+            for index, (group, summary) in enumerate(zip(groups, summaries), start=1):
+                people = [person for name in group for person in members[name]]
+                label = f"Group {tier}.{index} ({', '.join(people)})"
+                next_current[label] = summary
+                next_members[label] = people
+            current, members = next_current, next_members
+            tiers.append({"tier": tier, "groups": len(groups)})
+
+    report = {"fan_in": fan_in, "tiers": tiers, "group_calls": sum(t["groups"] for t in tiers)}
+    return {**current, **failed}, report
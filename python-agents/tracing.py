@@ -0,0 +1,179 @@
+import os
+import atexit
+import json
+import queue
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional
+
+# Tracing tuning
+TRACE_EXPORTER = os.getenv("TRACE_EXPORTER", "none")  # none | console | file
+TRACE_FILE = os.getenv("TRACE_FILE", "traces.jsonl")
+# Finished spans kept per trace for the coordination_events summary
+TRACE_MAX_SPANS = int(os.getenv("TRACE_MAX_SPANS", "500"))
+
+
+@dataclass
+class Span:
+    """One timed operation; spans sharing a trace_id form a waterfall"""
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str] = None
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    start_ns: int = field(default_factory=time.time_ns)
+    end_ns: Optional[int] = None
+    status: str = "ok"
+
+    @property
+    def duration_ms(self) -> float:
+        end = self.end_ns if self.end_ns is not None else time.time_ns()
+        return round((end - self.start_ns) / 1e6, 1)
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    def traceparent(self) -> str:
+        """W3C trace context header value pointing at this span"""
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start_ns": self.start_ns,
+            "end_ns": self.end_ns,
+            "duration_ms": self.duration_ms,
+            "status": self.status,
+            "attributes": self.attributes,
+        }
+
+
+current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+class _SpanWriter:
+    """Writes finished spans as JSON lines from a background thread"""
+
+    def __init__(self, exporter: str, path: str):
+        self.exporter = exporter
+        self.path = path
+        self._queue: "queue.SimpleQueue[Optional[Span]]" = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, name="span-writer", daemon=True)
+        self._thread.start()
+
+    def export(self, span: Span):
+        self._queue.put(span)
+
+    def _run(self):
+        output = open(self.path, "a", encoding="utf-8") if self.exporter == "file" else sys.stderr
+        try:
+            while (span := self._queue.get()) is not None:
+                output.write(json.dumps(span.as_dict(), default=str) + "\n")
+                if self._queue.empty():
+                    output.flush()
+        finally:
+            if output is not sys.stderr:
+                output.close()
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join(timeout=2)
+
+
+class Tracer:
+    """Minimal OpenTelemetry-style tracer with console and file exporters
+
+    Spans nest through a context variable, so child tasks created inside a
+    span (gather, create_task, LangGraph nodes) attach to it automatically.
+    Finished spans are kept per trace until the root span ends, which lets
+    an analysis summarize its own waterfall in ``coordination_events``.
+    """
+
+    def __init__(self, exporter: str = TRACE_EXPORTER, path: str = TRACE_FILE):
+        if exporter not in ("none", "console", "file"):
+            raise ValueError(f"Unknown trace exporter: {exporter}")
+        self._writer = _SpanWriter(exporter, path) if exporter != "none" else None
+        self._finished: Dict[str, List[Span]] = {}
+        self._trace_starts: Dict[str, int] = {}
+        if self._writer is not None:
+            atexit.register(self._writer.close)
+
+    @contextmanager
+    def span(self, name: str, **attributes: Any) -> Iterator[Span]:
+        parent = current_span.get()
+        span = Span(
+            name=name,
+            trace_id=parent.trace_id if parent else os.urandom(16).hex(),
+            span_id=os.urandom(8).hex(),
+            parent_id=parent.span_id if parent else None,
+            attributes=attributes
+        )
+        if parent is None:
+            self._trace_starts[span.trace_id] = span.start_ns
+        token = current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.status = "error"
+            span.set_attribute("error", f"{type(e).__name__}: {e}")
+            raise
+        finally:
+            span.end_ns = time.time_ns()
+            try:
+                current_span.reset(token)
+            except ValueError:
+                pass  # Async generator finalized from another context
+            self._finish(span, is_root=parent is None)
+
+    def _finish(self, span: Span, is_root: bool):
+        if self._writer is not None:
+            self._writer.export(span)
+        if is_root:
+            self._finished.pop(span.trace_id, None)
+            self._trace_starts.pop(span.trace_id, None)
+            return
+        if span.trace_id not in self._trace_starts:
+            return  # Root already ended (e.g. a task cancelled after its stream closed); nothing will collect this
+        spans = self._finished.setdefault(span.trace_id, [])
+        if len(spans) < TRACE_MAX_SPANS:
+            spans.append(span)
+
+    def inject(self, headers: Dict[str, str]) -> Dict[str, str]:
+        """Add a traceparent header for the current span (no-op outside a trace)"""
+        span = current_span.get()
+        if span is not None:
+            headers["traceparent"] = span.traceparent()
+        return headers
+
+    def summary(self) -> Optional[Dict[str, Any]]:
+        """Wall-clock per finished span in the current trace, for coordination_events"""
+        span = current_span.get()
+        if span is None:
+            return None
+        spans = sorted(self._finished.get(span.trace_id, []), key=lambda s: s.start_ns)
+        trace_start = self._trace_starts.get(span.trace_id, span.start_ns)
+        return {
+            "type": "trace_summary",
+            "trace_id": span.trace_id,
+            "spans": [
+                {
+                    "name": s.name,
+                    "offset_ms": round((s.start_ns - trace_start) / 1e6, 1),
+                    "duration_ms": s.duration_ms,
+                    "status": s.status,
+                    "attributes": s.attributes,
+                }
+                for s in spans
+            ],
+        }
+
+
+# Global tracer used by the endpoints, coordinators and HTTP clients
+tracer = Tracer()